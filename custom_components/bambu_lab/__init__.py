@@ -8,6 +8,7 @@ from homeassistant.components.frontend import add_extra_js_url
 from .const import DOMAIN, LOGGER, PLATFORMS
 from .coordinator import BambuDataUpdateCoordinator
 from .config_flow import CONFIG_VERSION
+from .views import async_register_views
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the Bambu Lab integration."""
@@ -36,6 +37,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Register the card JavaScript
     add_extra_js_url(hass, "/bambu_lab/bambu-printjobs-card.js")
 
+    async_register_views(hass)
+
     LOGGER.debug("async_setup_entry Complete")
 
     # Now that we've finished initialization fully, start the MQTT connection
@@ -1,16 +1,22 @@
+from collections import OrderedDict
+import threading
+
+from aiohttp import web
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.core import HomeAssistant
-from urllib.parse import urlparse
 
 from .const import DOMAIN, LOGGER
 from .models import BambuLabEntity
 from .pybambu.const import Features
 from .definitions import BambuLabSensorEntityDescription
 
-from homeassistant.components.camera import Camera, CameraEntityFeature
+from homeassistant.components.camera import Camera, CameraEntityFeature, Image
+from homeassistant.components.camera.img_util import scale_jpeg_camera_image
 
 from .coordinator import BambuDataUpdateCoordinator
+from .views import async_stream_mjpeg
 
 CHAMBER_CAMERA_SENSOR = BambuLabSensorEntityDescription(
         key="p1p_camera",
@@ -19,6 +25,8 @@ CHAMBER_CAMERA_SENSOR = BambuLabSensorEntityDescription(
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CAMERA_IMAGE) and not coordinator.camera_as_image_sensor,
     )
 
+RESIZED_IMAGE_CACHE_SIZE = 8
+
 async def async_setup_entry(
         hass: HomeAssistant,
         entry: ConfigEntry,
@@ -52,8 +60,6 @@ class BambuLabRtspCamera(BambuLabEntity, Camera):
         """Initialize the sensor."""
 
         self._attr_unique_id = f"{config_entry.data['serial']}_camera"
-        self._access_code = config_entry.options['access_code']
-        self._host = config_entry.options['host']
 
         super().__init__(coordinator=coordinator)
         Camera.__init__(self)
@@ -68,29 +74,35 @@ class BambuLabRtspCamera(BambuLabEntity, Camera):
 
     @property
     def use_stream_for_stills(self) -> bool:
-        return True
+        # With the broker, stills come from its shared session instead of opening another one.
+        return self.coordinator.rtsp_broker is None
 
     @property
     def available(self) -> bool:
         url = self.coordinator.get_model().camera.rtsp_url
         return url != None and url != "disable"
 
+    async def async_camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
+        broker = self.coordinator.rtsp_broker
+        if broker is None or not self.available:
+            return await super().async_camera_image(width, height)
+        image = await broker.async_get_image()
+        if image is None or width is None or height is None:
+            return image
+        return await self.hass.async_add_executor_job(
+            scale_jpeg_camera_image, Image("image/jpeg", image), width, height)
+
+    async def handle_async_mjpeg_stream(self, request: web.Request) -> web.StreamResponse | None:
+        if self.coordinator.rtsp_broker is None:
+            return await super().handle_async_mjpeg_stream(request)
+        # Keyframes from the shared session rather than a still poll per client.
+        return await async_stream_mjpeg(self.hass, self.coordinator, request)
+
     async def stream_source(self) -> str | None:
         if self.available:
-            # rtsps://192.168.1.1/streaming/live/1
-
-            LOGGER.debug(f"Raw RTSP URL: {self.coordinator.get_model().camera.rtsp_url}")
-            parsed_url = urlparse(self.coordinator.get_model().camera.rtsp_url)
-            split_host = parsed_url.netloc.split(':')
-            if self._host != "":
-                # For unknown reasons the returned rtsp URL sometimes has a completely incorrect IP address in it for the host.
-                # If we have the host IP (may not in bambu cloud mode), rewrite the URL to have that.
-                port = "322" if (len(split_host) == 1) else split_host[1]
-                url = fr"{parsed_url.scheme}://bblp:{self._access_code}@{self._host}:{port}{parsed_url.path}"
-            else:
-                url = fr"{parsed_url.scheme}://bblp:{self._access_code}@{parsed_url.netloc}{parsed_url.path}"
-            LOGGER.debug(f"Adjusted RTSP URL: {url.replace(self._access_code, '**REDACTED**')}")
-            return str(url)
+            if self.coordinator.rtsp_broker is not None:
+                return await self.coordinator.rtsp_broker.async_get_stream_url()
+            return self.coordinator.get_rtsp_url()
         LOGGER.debug("No RTSP Feed available")
         return None
 
@@ -110,12 +122,37 @@ class BambuLabImageCamera(BambuLabEntity, Camera):
         """Initialize the camera entity."""
 
         self._attr_unique_id = f"{config_entry.data['serial']}_camera"
+        # Resized snapshots keyed by (frame version, width, height) so tiles of the same size share one resize per frame.
+        self._resized_images: OrderedDict[tuple[int, int, int], bytes] = OrderedDict()
+        self._resized_images_lock = threading.Lock()
 
         super().__init__(coordinator=coordinator)
         Camera.__init__(self)
 
     def camera_image(self, width: int | None = None, height: int | None = None) -> bytes | None:
-        return self.coordinator.get_model().chamber_image.get_jpeg()
+        # Called in the executor so the resize doesn't block the event loop.
+        frame = self.coordinator.client.request_camera_frame()
+        if width is None or height is None or frame.version == 0:
+            return frame.jpeg
+
+        key = (frame.version, width, height)
+        with self._resized_images_lock:
+            image = self._resized_images.get(key)
+            if image is not None:
+                self._resized_images.move_to_end(key)
+                return image
+
+        image = scale_jpeg_camera_image(Image("image/jpeg", frame.jpeg), width, height)
+
+        with self._resized_images_lock:
+            self._resized_images[key] = image
+            while len(self._resized_images) > RESIZED_IMAGE_CACHE_SIZE:
+                self._resized_images.popitem(last=False)
+        return image
+
+    async def handle_async_mjpeg_stream(self, request: web.Request) -> web.StreamResponse:
+        """Stream chamber images to the client as they arrive from the printer."""
+        return await async_stream_mjpeg(self.hass, self.coordinator, request)
 
     @property
     def is_streaming(self) -> bool:
@@ -24,6 +24,17 @@ from homeassistant.helpers.selector import (
 
 from .const import DOMAIN, LOGGER
 from .pybambu import BambuClient, BambuCloud
+from .pybambu.bambu_client import (
+    CAMERA_CHANGE_THRESHOLD,
+    CAMERA_IDLE_TIMEOUT,
+    CAMERA_WORKER,
+    JSON_DECODER,
+    MQTT_TRANSPORT,
+    SHARED_CAMERA_IO,
+    SHARED_CLOUD_MQTT,
+)
+from .pybambu.cover_cache import COVER_CACHE_SIZE
+from .pybambu.timelapse import TIMELAPSE_CAPTURE
 from .pybambu.bambu_cloud import (
     CloudflareError,
     CurlUnavailableError,
@@ -63,6 +74,36 @@ MODE_SELECTOR = SelectSelector(
         mode=SelectSelectorMode.LIST,
     )
 )
+JSON_DECODER_LIST = [
+    SelectOptionDict(value="json", label="json (standard library)"),
+    SelectOptionDict(value="orjson", label="orjson (if installed)"),
+]
+JSON_DECODER_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=JSON_DECODER_LIST,
+        mode=SelectSelectorMode.DROPDOWN,
+    )
+)
+TIMELAPSE_CAPTURE_LIST = [
+    SelectOptionDict(value="layer", label="Every layer"),
+    SelectOptionDict(value="interval", label="At a fixed interval"),
+]
+TIMELAPSE_CAPTURE_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=TIMELAPSE_CAPTURE_LIST,
+        mode=SelectSelectorMode.DROPDOWN,
+    )
+)
+MQTT_TRANSPORT_LIST = [
+    SelectOptionDict(value="thread", label="Thread per printer"),
+    SelectOptionDict(value="asyncio", label="Shared asyncio loop"),
+]
+MQTT_TRANSPORT_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=MQTT_TRANSPORT_LIST,
+        mode=SelectSelectorMode.DROPDOWN,
+    )
+)
 
 
 class BambuLabFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -125,11 +166,7 @@ class BambuLabFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     default_email = config_entry.options['email']
                     username = config_entry.options['username']
                     auth_token = config_entry.options['auth_token']
-                    if await self.hass.async_add_executor_job(self._bambu_cloud.test_authentication,
-                                                              default_region,
-                                                              default_email,
-                                                              username,
-                                                              auth_token):
+                    if await self._bambu_cloud.async_test_authentication(default_region, default_email, username, auth_token):
                         LOGGER.debug("Found working credentials.")
                         self.region = default_region
                         self.email = default_email
@@ -145,21 +182,13 @@ class BambuLabFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             try:
                 if user_input.get('verifyCode', None) is not None:
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login_with_verification_code,
-                        user_input['verifyCode'])
+                    await self._bambu_cloud.async_login_with_verification_code(user_input['verifyCode'])
                 elif user_input.get('tfaCode', None) is not None:
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login_with_2fa_code,
-                        user_input['tfaCode'])
+                    await self._bambu_cloud.async_login_with_2fa_code(user_input['tfaCode'])
                 else:
                     self.region = user_input['region']
                     self.email = user_input['email']
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login,
-                        user_input['region'],
-                        user_input['email'],
-                        user_input['password'])
+                    await self._bambu_cloud.async_login(user_input['region'], user_input['email'], user_input['password'])
                 return await self.async_step_Bambu_Choose_Device(None)
 
             # Handle possible failure cases
@@ -217,8 +246,7 @@ class BambuLabFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             self.serial = user_input['serial']
             return await self.async_step_Bambu_Lan(None)
             
-        device_list = await self.hass.async_add_executor_job(
-            self._bambu_cloud.get_device_list)
+        device_list = await self._bambu_cloud.async_get_device_list()
             
         printer_list = []
         for device in device_list:
@@ -257,8 +285,7 @@ class BambuLabFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
         LOGGER.debug("async_step_Bambu_Lan")
 
-        device_list = await self.hass.async_add_executor_job(
-            self._bambu_cloud.get_device_list)
+        device_list = await self._bambu_cloud.async_get_device_list()
 
         for device in device_list:
             if device['dev_id'] == self.serial:
@@ -404,6 +431,8 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
         self.config_entry = config_entry
         self.region = self.config_entry.options.get('region', '')
         self.email = self.config_entry.options.get('email', '')
+        self._title = None
+        self._options = None
 
         self._bambu_cloud = BambuCloud("", "", "", "")
 
@@ -446,11 +475,7 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
                     email = config_entry.options['email']
                     username = config_entry.options['username']
                     auth_token = config_entry.options['auth_token']
-                    if await self.hass.async_add_executor_job(self._bambu_cloud.test_authentication,
-                                                              region,
-                                                              email,
-                                                              username,
-                                                              auth_token):
+                    if await self._bambu_cloud.async_test_authentication(region, email, username, auth_token):
                         LOGGER.debug("Found working credentials.")
                         self.region = region
                         self.email = email
@@ -466,25 +491,17 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
         if user_input is not None:
             try:
                 if user_input.get('verifyCode', None) is not None:
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login_with_verification_code,
-                        user_input['verifyCode'])
+                    await self._bambu_cloud.async_login_with_verification_code(user_input['verifyCode'])
                     return await self.async_step_Bambu_Lan(None)
 
                 elif user_input.get('tfaCode', None) is not None:
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login_with_2fa_code,
-                        user_input['tfaCode'])
+                    await self._bambu_cloud.async_login_with_2fa_code(user_input['tfaCode'])
                     return await self.async_step_Bambu_Lan(None)
 
                 else:
                     self.region = user_input['region']
                     self.email = user_input['email']
-                    await self.hass.async_add_executor_job(
-                        self._bambu_cloud.login,
-                        user_input['region'],
-                        user_input['email'],
-                        user_input['password'])
+                    await self._bambu_cloud.async_login(user_input['region'], user_input['email'], user_input['password'])
                     return await self.async_step_Bambu_Lan(None)
 
             # Handle possible failure cases
@@ -546,8 +563,7 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
         errors = {}
         LOGGER.debug("async_step_Bambu_Lan")
 
-        device_list = await self.hass.async_add_executor_job(
-            self._bambu_cloud.get_device_list)
+        device_list = await self._bambu_cloud.async_get_device_list()
 
         if (user_input is not None) and ((user_input.get('host', "") != "") or (user_input['local_mqtt'] == False)):
             for device in device_list:
@@ -569,8 +585,6 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
                             errors['base'] = "cannot_connect_local_ip"
                 
                     if success:
-                        LOGGER.debug(f"Options Flow: Writing entry: '{device['name']}'")
-                        data = dict(self.config_entry.data)
                         options = {
                             "region": self.region,
                             "email": self.email,
@@ -582,15 +596,9 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
                             "access_code": user_input['access_code'],
                             "usage_hours": float(user_input['usage_hours'])
                         }
-                        title = device['dev_id']
-                        self.hass.config_entries.async_update_entry(
-                            entry=self.config_entry,
-                            title=title,
-                            data=data,
-                            options=options
-                        )
-                        await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-                        return self.async_create_entry(title="", data=None)
+                        self._title = device['dev_id']
+                        self._options = options
+                        return await self.async_step_Advanced(None)
 
         printer_list = []
         access_code = ''
@@ -619,7 +627,7 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
             step_id="Bambu_Lan",
             data_schema=vol.Schema(fields),
             errors=errors or {},
-            last_step=True,
+            last_step=False,
         )
     
     async def async_step_Lan(
@@ -640,8 +648,6 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
             success = await bambu.try_connection()
 
             if success:
-                LOGGER.debug("Options Flow: Writing entry")
-                data = dict(self.config_entry.data)
                 options = {
                     "region": self.config_entry.options.get('region', ''),
                     "email": self.config_entry.options.get('email', ''),
@@ -654,15 +660,9 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
                     "usage_hours": float(user_input['usage_hours'])
                 }
 
-                title = self.config_entry.data['serial']
-                self.hass.config_entries.async_update_entry(
-                    entry=self.config_entry,
-                    title=title,
-                    data=data,
-                    options=options
-                )
-                await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-                return self.async_create_entry(title="", data=None)
+                self._title = self.config_entry.data['serial']
+                self._options = options
+                return await self.async_step_Advanced(None)
 
             errors['base'] = "cannot_connect_local_all"
 
@@ -679,5 +679,50 @@ class BambuOptionsFlowHandler(config_entries.OptionsFlow):
             step_id="Lan",
             data_schema=vol.Schema(fields),
             errors=errors or {},
+            last_step=False,
+        )
+
+    async def async_step_Advanced(
+            self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        if user_input is not None:
+            LOGGER.debug("Options Flow: Writing entry")
+            options = dict(self._options)
+            options.update(user_input)
+            options['camera_idle_timeout'] = float(user_input['camera_idle_timeout'])
+            options['camera_change_threshold'] = float(user_input['camera_change_threshold'])
+            options['cover_cache_size'] = int(float(user_input['cover_cache_size']) * 1024 * 1024)
+            self.hass.config_entries.async_update_entry(
+                entry=self.config_entry,
+                title=self._title,
+                data=dict(self.config_entry.data),
+                options=options
+            )
+            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            return self.async_create_entry(title="", data=None)
+
+        # Build form
+        fields: OrderedDict[vol.Marker, Any] = OrderedDict()
+        fields[vol.Optional('mqtt_transport', default=self.config_entry.options.get('mqtt_transport', MQTT_TRANSPORT))] = MQTT_TRANSPORT_SELECTOR
+        fields[vol.Optional('shared_cloud_mqtt', default=self.config_entry.options.get('shared_cloud_mqtt', SHARED_CLOUD_MQTT))] = BOOLEAN_SELECTOR
+        fields[vol.Optional('json_decoder', default=self.config_entry.options.get('json_decoder', JSON_DECODER))] = JSON_DECODER_SELECTOR
+        fields[vol.Optional('camera_on_demand', default=self.config_entry.options.get('camera_on_demand', False))] = BOOLEAN_SELECTOR
+        default_camera_idle_timeout = str(self.config_entry.options.get('camera_idle_timeout', CAMERA_IDLE_TIMEOUT))
+        fields[vol.Optional('camera_idle_timeout', default=default_camera_idle_timeout)] = NUMBER_SELECTOR
+        default_camera_change_threshold = str(self.config_entry.options.get('camera_change_threshold', CAMERA_CHANGE_THRESHOLD))
+        fields[vol.Optional('camera_change_threshold', default=default_camera_change_threshold)] = NUMBER_SELECTOR
+        fields[vol.Optional('enable_timelapse', default=self.config_entry.options.get('enable_timelapse', False))] = BOOLEAN_SELECTOR
+        fields[vol.Optional('timelapse_capture', default=self.config_entry.options.get('timelapse_capture', TIMELAPSE_CAPTURE))] = TIMELAPSE_CAPTURE_SELECTOR
+        fields[vol.Optional('shared_camera_io', default=self.config_entry.options.get('shared_camera_io', SHARED_CAMERA_IO))] = BOOLEAN_SELECTOR
+        fields[vol.Optional('camera_worker', default=self.config_entry.options.get('camera_worker', CAMERA_WORKER))] = BOOLEAN_SELECTOR
+        fields[vol.Optional('rtsp_broker', default=self.config_entry.options.get('rtsp_broker', False))] = BOOLEAN_SELECTOR
+        fields[vol.Optional('enable_anomaly_detection', default=self.config_entry.options.get('enable_anomaly_detection', False))] = BOOLEAN_SELECTOR
+        # Stored in bytes but shown in MB.
+        default_cover_cache_size = str(self.config_entry.options.get('cover_cache_size', COVER_CACHE_SIZE) / (1024 * 1024))
+        fields[vol.Optional('cover_cache_size', default=default_cover_cache_size)] = NUMBER_SELECTOR
+
+        return self.async_show_form(
+            step_id="Advanced",
+            data_schema=vol.Schema(fields),
             last_step=True,
         )
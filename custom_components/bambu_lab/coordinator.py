@@ -7,19 +7,108 @@ from .const import (
     LOGGERFORHA
 )
 import asyncio
+import os
+import threading
 from typing import Any
+from urllib.parse import urlparse
 
+from homeassistant.components.ffmpeg import get_ffmpeg_manager
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers import device_registry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 
 import paho.mqtt.client as mqtt
 
 from .pybambu import BambuClient
 from .pybambu.const import Features
+from .rtsp_broker import RtspBroker
+
+# Transitions that automations trigger on. These are delivered in order and never merged.
+PRIORITY_EVENTS = {
+    "event_hms_errors",
+    "event_print_canceled",
+    "event_print_chaotic",
+    "event_print_error",
+    "event_print_failed",
+    "event_print_finished",
+    "event_print_stalled",
+    "event_print_started",
+}
+
+
+class EventMailbox:
+    """Collects events raised on the MQTT and camera threads and drains them on the HA event loop.
+
+    Pending telemetry events are collapsed into a set of dirty flags since the model always holds the
+    latest state, and only a single drain is ever scheduled on the event loop at a time. Priority events
+    are queued separately and handled first, in the order they were raised.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, handler) -> None:
+        self._loop = loop
+        self._handler = handler
+        self._lock = threading.Lock()
+        self._priority_events: list[str] = []
+        self._pending_events: dict[str, None] = {}
+        self._drain_scheduled = False
+
+    def post(self, event: str) -> None:
+        with self._lock:
+            if event in PRIORITY_EVENTS:
+                self._priority_events.append(event)
+            else:
+                self._pending_events[event] = None
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        with self._lock:
+            priority_events = self._priority_events
+            pending_events = self._pending_events
+            self._priority_events = []
+            self._pending_events = {}
+            self._drain_scheduled = False
+
+        for event in (*priority_events, *pending_events):
+            try:
+                self._handler(event)
+            except Exception as e:
+                LOGGER.error(f"An exception occurred handling '{event}':", exc_info=e)
+
+
+class FrameBroadcaster:
+    """Pushes each new chamber image frame once to every connected stream client.
+
+    Each client gets a single slot queue so a slow client skips straight to the newest frame
+    instead of buffering ones it hasn't sent yet. Only used from the HA event loop.
+    """
+
+    def __init__(self) -> None:
+        self._queues: set[asyncio.Queue] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return len(self._queues) != 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self._queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+
+    def publish(self, frame) -> None:
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
 
 class BambuDataUpdateCoordinator(DataUpdateCoordinator):
     hass: HomeAssistant
@@ -34,11 +123,24 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
         self.latest_usage_hours = float(entry.options.get('usage_hours', 0))
         config = entry.data.copy()
         config.update(entry.options.items())
+        # Cover images are kept on disk so they survive restarts and are reused by reprints.
+        config.setdefault('cover_cache_directory', hass.config.path(DOMAIN, "cover_cache"))
+        if config.get('enable_timelapse', False):
+            # Timelapses are assembled with HA's ffmpeg into the local media folder by default.
+            media_dir = hass.config.media_dirs.get("local", hass.config.path("media"))
+            config.setdefault('timelapse_directory', os.path.join(media_dir, DOMAIN, "timelapse"))
+            config.setdefault('ffmpeg_binary', get_ffmpeg_manager(hass).binary)
         self.client = BambuClient(config)
             
         self._updatedDevice = False
+        self._entity_listeners: dict[CALLBACK_TYPE, tuple[CALLBACK_TYPE, frozenset | None]] = {}
         self.data = self.get_model()
         self._eventloop = asyncio.get_running_loop()
+        self._mailbox = EventMailbox(self._eventloop, self.event_handler_internal)
+        self.chamber_image_broadcaster = FrameBroadcaster()
+        self.rtsp_broker = None
+        if config.get('rtsp_broker', False):
+            self.rtsp_broker = RtspBroker(hass, self, get_ffmpeg_manager(hass).binary)
         # Pass LOGGERFORHA logger into HA as otherwise it generates a debug output line every single time we tell it we have an update
         # which fills the logs and makes the useful logging data less accessible.
         super().__init__(
@@ -57,7 +159,8 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
 
     def event_handler(self, event):
         # The callback comes in on the MQTT thread. Need to jump to the HA main thread to guarantee thread safety.
-        self._eventloop.call_soon_threadsafe(self.event_handler_internal, event)
+        # The mailbox coalesces events raised while a drain is already pending.
+        self._mailbox.post(event)
 
     def event_handler_internal(self, event):
         # if event != "event_printer_chamber_image_update":
@@ -78,7 +181,7 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
             self._update_data()
 
         elif event == "event_printer_data_update":
-            self._update_data()
+            self._update_data(self.get_model().pop_changed_fields())
 
             # Check is usage hours change and persist to config entry if it did.
             if self.latest_usage_hours != self.get_model().info.usage_hours:
@@ -110,7 +213,15 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
         elif event == "event_print_started":
             self.PublishDeviceTriggerEvent(event)
 
+        elif event == "event_print_stalled":
+            self.PublishDeviceTriggerEvent(event)
+
+        elif event == "event_print_chaotic":
+            self.PublishDeviceTriggerEvent(event)
+
         elif event == "event_printer_chamber_image_update":
+            if self.chamber_image_broadcaster.has_subscribers:
+                self.chamber_image_broadcaster.publish(self.get_model().chamber_image.get_frame())
             if self.camera_as_image_sensor:
                 self._update_data()
 
@@ -128,6 +239,8 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
 
     def shutdown(self) -> None:
         """ Halt the MQTT listener thread """
+        if self.rtsp_broker is not None:
+            self.rtsp_broker.stop()
         self.client.disconnect()
 
     async def _publish(self, msg):
@@ -138,14 +251,42 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
         device = self.get_model()
         return device
     
-    def _update_data(self):
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context: Any = None) -> CALLBACK_TYPE:
+        """Listen for data updates, recording which model fields the listener depends on."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._entity_listeners[remove_listener] = (update_callback, context)
+
+        @callback
+        def remove_entity_listener() -> None:
+            self._entity_listeners.pop(remove_listener, None)
+            remove_listener()
+
+        return remove_entity_listener
+
+    def _update_data(self, changed_fields: set | None = None):
         device = self.get_model()
-        try:
-            self.async_set_updated_data(device)
-        except Exception as e:
-            LOGGER.error("An exception occurred calling async_set_updated_data():")
-            LOGGER.error(f"Exception type: {type(e)}")
-            LOGGER.error(f"Exception data: {e}")
+        if not changed_fields:
+            # We don't know what changed so every entity has to update.
+            try:
+                self.async_set_updated_data(device)
+            except Exception as e:
+                LOGGER.error("An exception occurred calling async_set_updated_data():")
+                LOGGER.error(f"Exception type: {type(e)}")
+                LOGGER.error(f"Exception data: {e}")
+            return
+
+        # Only notify the entities that depend on a changed field. Entities that didn't declare any dependencies
+        # have a context of None and are always notified.
+        self.data = device
+        for update_callback, depends_on in list(self._entity_listeners.values()):
+            if depends_on is None or not depends_on.isdisjoint(changed_fields):
+                try:
+                    update_callback()
+                except Exception as e:
+                    LOGGER.error("An exception occurred notifying an entity of a data update:")
+                    LOGGER.error(f"Exception type: {type(e)}")
+                    LOGGER.error(f"Exception data: {e}")
 
     def _update_hms(self):
         dev_reg = device_registry.async_get(self._hass)
@@ -330,6 +471,27 @@ class BambuDataUpdateCoordinator(DataUpdateCoordinator):
             data=self.config_entry.data,
             options=options)
 
+    def get_rtsp_url(self) -> str | None:
+        rtsp_url = self.get_model().camera.rtsp_url
+        if rtsp_url is None or rtsp_url == "disable":
+            return None
+
+        # rtsps://192.168.1.1/streaming/live/1
+        LOGGER.debug(f"Raw RTSP URL: {rtsp_url}")
+        host = self.config_entry.options['host']
+        access_code = self.config_entry.options['access_code']
+        parsed_url = urlparse(rtsp_url)
+        split_host = parsed_url.netloc.split(':')
+        if host != "":
+            # For unknown reasons the returned rtsp URL sometimes has a completely incorrect IP address in it for the host.
+            # If we have the host IP (may not in bambu cloud mode), rewrite the URL to have that.
+            port = "322" if (len(split_host) == 1) else split_host[1]
+            url = fr"{parsed_url.scheme}://bblp:{access_code}@{host}:{port}{parsed_url.path}"
+        else:
+            url = fr"{parsed_url.scheme}://bblp:{access_code}@{parsed_url.netloc}{parsed_url.path}"
+        LOGGER.debug(f"Adjusted RTSP URL: {url.replace(access_code, '**REDACTED**')}")
+        return str(url)
+
     @property
     def camera_enabled(self):
         options = dict(self.config_entry.options)
@@ -48,6 +48,8 @@ class BambuLabSensorEntityDescription(SensorEntityDescription, BambuLabSensorEnt
     exists_fn: Callable[..., bool] = lambda _: True
     extra_attributes: Callable[..., dict] = lambda _: {}
     icon_fn: Callable[..., str] = lambda _: None
+    # Model fields ("<sub-model>" or "<sub-model>.<field>") the entity state is derived from. Empty means always update.
+    depends_on: tuple[str, ...] = ()
 
 
 @dataclass
@@ -62,6 +64,7 @@ class BambuLabBinarySensorEntityDescription(BinarySensorEntityDescription, Bambu
     available_fn: Callable[..., bool] = lambda _: True
     exists_fn: Callable[..., bool] = lambda _: True
     extra_attributes: Callable[..., dict] = lambda _: {}
+    depends_on: tuple[str, ...] = ()
 
 
 PRINTER_BINARY_SENSORS: tuple[BambuLabBinarySensorEntityDescription, ...] = (
@@ -70,7 +73,8 @@ PRINTER_BINARY_SENSORS: tuple[BambuLabBinarySensorEntityDescription, ...] = (
         translation_key="timelapse",
         icon="mdi:camera",
         device_class=BinarySensorDeviceClass.RUNNING,
-        is_on_fn=lambda self: self.coordinator.get_model().camera.timelapse == 'enable'
+        is_on_fn=lambda self: self.coordinator.get_model().camera.timelapse == 'enable',
+        depends_on=("camera.timelapse",),
     ),
     BambuLabBinarySensorEntityDescription(
         key="hms",
@@ -78,7 +82,8 @@ PRINTER_BINARY_SENSORS: tuple[BambuLabBinarySensorEntityDescription, ...] = (
         device_class=BinarySensorDeviceClass.PROBLEM,
         entity_category=EntityCategory.DIAGNOSTIC,
         is_on_fn=lambda self: self.coordinator.get_model().hms.error_count != 0,
-        extra_attributes=lambda self: self.coordinator.get_model().hms.errors
+        extra_attributes=lambda self: self.coordinator.get_model().hms.errors,
+        depends_on=("hms",),
     ),
     BambuLabBinarySensorEntityDescription(
         key="print_error",
@@ -86,7 +91,8 @@ PRINTER_BINARY_SENSORS: tuple[BambuLabBinarySensorEntityDescription, ...] = (
         device_class=BinarySensorDeviceClass.PROBLEM,
         entity_category=EntityCategory.DIAGNOSTIC,
         is_on_fn=lambda self: self.coordinator.get_model().print_error.on != 0,
-        extra_attributes=lambda self: self.coordinator.get_model().print_error.error
+        extra_attributes=lambda self: self.coordinator.get_model().print_error.error,
+        depends_on=("print_error",),
     ),
     BambuLabBinarySensorEntityDescription(
         key="online",
@@ -100,7 +106,8 @@ PRINTER_BINARY_SENSORS: tuple[BambuLabBinarySensorEntityDescription, ...] = (
         translation_key="firmware_update",
         device_class=BinarySensorDeviceClass.UPDATE,
         entity_category=EntityCategory.DIAGNOSTIC,
-        is_on_fn=lambda self: self.coordinator.get_model().info.new_version_state == 1
+        is_on_fn=lambda self: self.coordinator.get_model().info.new_version_state == 1,
+        depends_on=("info.new_version_state",),
     ),
     BambuLabBinarySensorEntityDescription(
         key="door_open",
@@ -120,7 +127,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         entity_category=EntityCategory.DIAGNOSTIC,
         device_class=SensorDeviceClass.ENUM,
         options=["bambu_cloud", "local"],
-        value_fn=lambda self: self.coordinator.get_model().info.mqtt_mode
+        value_fn=lambda self: self.coordinator.get_model().info.mqtt_mode,
+        depends_on=("info.mqtt_mode",),
     ),
     BambuLabSensorEntityDescription(
         key="wifi_signal",
@@ -129,7 +137,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         state_class=SensorStateClass.MEASUREMENT,
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda self: self.coordinator.get_model().info.wifi_signal
+        value_fn=lambda self: self.coordinator.get_model().info.wifi_signal,
+        depends_on=("info.wifi_signal",),
     ),
     BambuLabSensorEntityDescription(
         key="bed_temp",
@@ -137,7 +146,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda self: self.coordinator.get_model().temperature.bed_temp
+        value_fn=lambda self: self.coordinator.get_model().temperature.bed_temp,
+        depends_on=("temperature.bed_temp",),
     ),
     BambuLabSensorEntityDescription(
         key="target_bed_temp",
@@ -145,7 +155,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda self: self.coordinator.get_model().temperature.target_bed_temp
+        value_fn=lambda self: self.coordinator.get_model().temperature.target_bed_temp,
+        depends_on=("temperature.target_bed_temp",),
     ),
     BambuLabSensorEntityDescription(
         key="chamber_temp",
@@ -154,7 +165,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda self: self.coordinator.get_model().temperature.chamber_temp,
-        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CHAMBER_TEMPERATURE)
+        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CHAMBER_TEMPERATURE),
+        depends_on=("temperature.chamber_temp",),
     ),
     BambuLabSensorEntityDescription(
         key="target_nozzle_temp",
@@ -163,7 +175,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:printer-3d-nozzle",
-        value_fn=lambda self: self.coordinator.get_model().temperature.target_nozzle_temp
+        value_fn=lambda self: self.coordinator.get_model().temperature.target_nozzle_temp,
+        depends_on=("temperature.target_nozzle_temp",),
     ),
     BambuLabSensorEntityDescription(
         key="nozzle_temp",
@@ -172,7 +185,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:printer-3d-nozzle",
-        value_fn=lambda self: self.coordinator.get_model().temperature.nozzle_temp
+        value_fn=lambda self: self.coordinator.get_model().temperature.nozzle_temp,
+        depends_on=("temperature.nozzle_temp",),
     ),
     BambuLabSensorEntityDescription(
         key="aux_fan_speed",
@@ -182,6 +196,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon="mdi:fan",
         value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.AUXILIARY),
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AUX_FAN),
+        depends_on=("fans",),
     ),
     BambuLabSensorEntityDescription(
         key="chamber_fan_speed",
@@ -190,7 +205,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:fan",
         value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.CHAMBER),
-        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CHAMBER_FAN)
+        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CHAMBER_FAN),
+        depends_on=("fans",),
     ),
     BambuLabSensorEntityDescription(
         key="cooling_fan_speed",
@@ -198,7 +214,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:fan",
-        value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.PART_COOLING)
+        value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.PART_COOLING),
+        depends_on=("fans",),
     ),
     BambuLabSensorEntityDescription(
         key="heatbreak_fan_speed",
@@ -206,7 +223,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:fan",
-        value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.HEATBREAK)
+        value_fn=lambda self: self.coordinator.get_model().fans.get_fan_speed(FansEnum.HEATBREAK),
+        depends_on=("fans",),
     ),
     BambuLabSensorEntityDescription(
         key="speed_profile",
@@ -215,7 +233,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         value_fn=lambda self: self.coordinator.get_model().speed.name,
         extra_attributes=lambda self: {"modifier": self.coordinator.get_model().speed.modifier},
         device_class=SensorDeviceClass.ENUM,
-        options=[speed for i, speed in SPEED_PROFILE.items()]
+        options=[speed for i, speed in SPEED_PROFILE.items()],
+        depends_on=("speed",),
     ),
     BambuLabSensorEntityDescription(
         key="stage",
@@ -225,7 +244,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             self: "offline" if (not self.coordinator.get_model().info.online and not self.coordinator.client.manual_refresh_mode) else self.coordinator.get_model().stage.description,
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.CURRENT_STAGE),
         device_class=SensorDeviceClass.ENUM,
-        options=CURRENT_STAGE_OPTIONS + ["offline"]
+        options=CURRENT_STAGE_OPTIONS + ["offline"],
+        depends_on=("stage.description", "info.online"),
     ),
     BambuLabSensorEntityDescription(
         key="print_progress",
@@ -233,7 +253,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         state_class=SensorStateClass.MEASUREMENT,
         icon="mdi:progress-clock",
-        value_fn=lambda self: self.coordinator.get_model().print_job.print_percentage
+        value_fn=lambda self: self.coordinator.get_model().print_job.print_percentage,
+        depends_on=("print_job.print_percentage",),
     ),
     BambuLabSensorEntityDescription(
         key="print_status",
@@ -242,7 +263,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         value_fn=lambda
             self: "offline" if (not self.coordinator.get_model().info.online and not self.coordinator.client.manual_refresh_mode) else self.coordinator.get_model().print_job.gcode_state.lower(),
         device_class=SensorDeviceClass.ENUM,
-        options=GCODE_STATE_OPTIONS + ["offline"]
+        options=GCODE_STATE_OPTIONS + ["offline"],
+        depends_on=("print_job.gcode_state", "info.online"),
     ),
     BambuLabSensorEntityDescription(
         key="start_time",
@@ -251,6 +273,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         available_fn=lambda self: self.coordinator.get_model().print_job.start_time is not None,
         value_fn=lambda self: self.coordinator.get_model().print_job.start_time,
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.START_TIME) or coordinator.get_model().supports_feature(Features.START_TIME_GENERATED),
+        depends_on=("print_job.start_time",),
     ),
     BambuLabSensorEntityDescription(
         key="remaining_time",
@@ -258,7 +281,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon="mdi:timer-sand",
         native_unit_of_measurement=UnitOfTime.MINUTES,
         device_class=SensorDeviceClass.DURATION,
-        value_fn=lambda self: self.coordinator.get_model().print_job.remaining_time
+        value_fn=lambda self: self.coordinator.get_model().print_job.remaining_time,
+        depends_on=("print_job.remaining_time",),
     ),
     BambuLabSensorEntityDescription(
         key="end_time",
@@ -266,6 +290,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon="mdi:clock",
         available_fn=lambda self: self.coordinator.get_model().print_job.end_time is not None,
         value_fn=lambda self: self.coordinator.get_model().print_job.end_time,
+        depends_on=("print_job.end_time",),
     ),
     BambuLabSensorEntityDescription(
         key="total_usage_hours",
@@ -276,6 +301,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         entity_category=EntityCategory.DIAGNOSTIC,
         available_fn=lambda self: self.coordinator.get_model().info.usage_hours is not None,
         value_fn=lambda self: self.coordinator.get_model().info.usage_hours,
+        depends_on=("info.usage_hours",),
     ),
     BambuLabSensorEntityDescription(
         key="current_layer",
@@ -284,6 +310,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda self: self.coordinator.get_model().print_job.current_layer,
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.PRINT_LAYERS),
+        depends_on=("print_job.current_layer",),
     ),
     BambuLabSensorEntityDescription(
         key="total_layers",
@@ -292,6 +319,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda self: self.coordinator.get_model().print_job.total_layers,
         exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.PRINT_LAYERS),
+        depends_on=("print_job.total_layers",),
     ),
     BambuLabSensorEntityDescription(
         key="tray_now",
@@ -300,21 +328,24 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         available_fn=lambda self: self.coordinator.get_model().supports_feature(
             Features.AMS) and self.coordinator.get_model().ams.tray_now != 255,
         value_fn=lambda self: self.coordinator.get_model().ams.tray_now + 1,
-        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS)
+        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS),
+        depends_on=("ams.tray_now",),
     ),
     BambuLabSensorEntityDescription(
         key="gcode_file",
         translation_key="gcode_file",
         available_fn=lambda self: self.coordinator.get_model().print_job.gcode_file != "",
         value_fn=lambda self: self.coordinator.get_model().print_job.gcode_file,
-        icon_fn=lambda self: self.coordinator.get_model().print_job.file_type_icon
+        icon_fn=lambda self: self.coordinator.get_model().print_job.file_type_icon,
+        depends_on=("print_job.gcode_file", "print_job.file_type_icon"),
     ),
     BambuLabSensorEntityDescription(
         key="subtask_name",
         translation_key="subtask_name",
         available_fn=lambda self: self.coordinator.get_model().print_job.subtask_name != "",
         value_fn=lambda self: self.coordinator.get_model().print_job.subtask_name,
-        icon_fn=lambda self: self.coordinator.get_model().print_job.file_type_icon
+        icon_fn=lambda self: self.coordinator.get_model().print_job.file_type_icon,
+        depends_on=("print_job.subtask_name", "print_job.file_type_icon"),
     ),
     BambuLabSensorEntityDescription(
         key="print_type",
@@ -324,6 +355,7 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon_fn=lambda self: self.coordinator.get_model().print_job.file_type_icon,
         options=PRINT_TYPE_OPTIONS,
         device_class=SensorDeviceClass.ENUM,
+        depends_on=("print_job.print_type", "print_job.file_type_icon"),
     ),
     BambuLabSensorEntityDescription(
         key="name",
@@ -340,14 +372,16 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon="mdi:file",
         value_fn=lambda self: self.coordinator.get_model().print_job.print_length,
         extra_attributes=lambda self: self.coordinator.get_model().print_job.get_ams_print_lengths,
-        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection
+        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection,
+        depends_on=("print_job.print_length", "print_job._ams_print_lengths"),
     ),
     BambuLabSensorEntityDescription(
         key="print_bed_type",
         translation_key="print_bed_type",
         icon="mdi:file",
         value_fn=lambda self: self.coordinator.get_model().print_job.print_bed_type,
-        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection
+        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection,
+        depends_on=("print_job.print_bed_type",),
     ),
     BambuLabSensorEntityDescription(
         key="print_weight",
@@ -358,7 +392,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         icon="mdi:file",
         value_fn=lambda self: self.coordinator.get_model().print_job.print_weight,
         extra_attributes=lambda self: self.coordinator.get_model().print_job.get_ams_print_weights,
-        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection
+        exists_fn=lambda coordinator: coordinator.get_model().info.has_bambu_cloud_connection,
+        depends_on=("print_job.print_weight", "print_job._ams_print_weights"),
     ),
     BambuLabSensorEntityDescription(
         key="active_tray",
@@ -378,7 +413,8 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "type": self.coordinator.get_model().get_active_tray().type,
         },
         available_fn=lambda self: self.coordinator.get_model().get_active_tray() is not None,
-        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS)
+        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS),
+        depends_on=("ams", "external_spool"),
     ),
     BambuLabSensorEntityDescription(
         key="nozzle_diameter",
@@ -386,13 +422,15 @@ PRINTER_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         native_unit_of_measurement=UnitOfLength.MILLIMETERS,
         device_class=SensorDeviceClass.DISTANCE,
         icon="mdi:printer-3d-nozzle",
-        value_fn=lambda self: self.coordinator.get_model().info.nozzle_diameter
+        value_fn=lambda self: self.coordinator.get_model().info.nozzle_diameter,
+        depends_on=("info.nozzle_diameter",),
     ),
     BambuLabSensorEntityDescription(
         key="nozzle_type",
         translation_key="nozzle_type",
         icon="mdi:printer-3d-nozzle",
-        value_fn=lambda self: self.coordinator.get_model().info.nozzle_type
+        value_fn=lambda self: self.coordinator.get_model().info.nozzle_type,
+        depends_on=("info.nozzle_type",),
     ),
 )
 
@@ -413,6 +451,7 @@ VIRTUAL_TRAY_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "nozzle_temp_max": self.coordinator.get_model().external_spool.nozzle_temp_max,
             "type": self.coordinator.get_model().external_spool.type,
         },
+        depends_on=("external_spool", "ams.tray_now"),
     ),
 )
 
@@ -422,8 +461,9 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         translation_key="humidity_index",
         icon="mdi:water-percent",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda self: 6 - self.coordinator.get_model().ams.data[self.index].humidity_index
+        value_fn=lambda self: 6 - self.coordinator.get_model().ams.data[self.index].humidity_index,
         # We subtract from 6 to match the new Bambu Handy/Studio presentation of 1 = dry, 5 = wet while the printer sends 1 = wet, 5 = dry
+        depends_on=("ams",),
     ),
     BambuLabSensorEntityDescription(
         key="temperature",
@@ -432,7 +472,8 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda self: self.coordinator.get_model().ams.data[self.index].temperature,
-        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS_TEMPERATURE)
+        exists_fn=lambda coordinator: coordinator.get_model().supports_feature(Features.AMS_TEMPERATURE),
+        depends_on=("ams",),
     ),
     BambuLabSensorEntityDescription(
         key="tray_1",
@@ -454,6 +495,7 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "tray_uuid": self.coordinator.get_model().ams.data[self.index].tray[0].tray_uuid,
             "type": self.coordinator.get_model().ams.data[self.index].tray[0].type,
         },
+        depends_on=("ams",),
     ),
     BambuLabSensorEntityDescription(
         key="tray_2",
@@ -475,6 +517,7 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "tray_uuid": self.coordinator.get_model().ams.data[self.index].tray[1].tray_uuid,
             "type": self.coordinator.get_model().ams.data[self.index].tray[1].type,
         },
+        depends_on=("ams",),
     ),
     BambuLabSensorEntityDescription(
         key="tray_3",
@@ -496,6 +539,7 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "tray_uuid": self.coordinator.get_model().ams.data[self.index].tray[2].tray_uuid,
             "type": self.coordinator.get_model().ams.data[self.index].tray[2].type,
         },
+        depends_on=("ams",),
     ),
     BambuLabSensorEntityDescription(
         key="tray_4",
@@ -517,5 +561,6 @@ AMS_SENSORS: tuple[BambuLabSensorEntityDescription, ...] = (
             "tray_uuid": self.coordinator.get_model().ams.data[self.index].tray[3].tray_uuid,
             "type": self.coordinator.get_model().ams.data[self.index].tray[3].type,
         },
+        depends_on=("ams",),
     ),
 )
@@ -21,8 +21,10 @@ from .const import DOMAIN, LOGGER
 
 TRIGGER_TYPES = {
     "event_print_canceled",
+    "event_print_chaotic",
     "event_print_failed",
     "event_print_finished",
+    "event_print_stalled",
     "event_print_started",
     "event_printer_error",
 }
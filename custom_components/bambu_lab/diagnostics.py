@@ -40,6 +40,10 @@ async def async_get_config_entry_diagnostics(
         "config_entry": async_redact_data(entry, TO_REDACT),
         "push_all": async_redact_data(coordinator.data.push_all_data, TO_REDACT),
         "get_version": async_redact_data(coordinator.data.get_version_data, TO_REDACT),
+        "camera": {
+            "on_demand": coordinator.client.camera_on_demand,
+            "connected_ratio": round(coordinator.client.camera_connected_ratio, 3),
+        },
     }
 
     return diagnostics_data
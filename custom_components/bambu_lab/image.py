@@ -16,6 +16,8 @@ from .coordinator import BambuDataUpdateCoordinator
 from .models import BambuLabEntity
 from .definitions import BambuLabSensorEntityDescription
 from .pybambu.const import Features
+from .pybambu.cover_cache import COVER_VARIANTS
+from .views import CoverImageView
 import xml.etree.ElementTree as ET
 from .pybambu.commands import PRINT_FILE_TEMPLATE
 
@@ -91,6 +93,12 @@ class CoverImage(ImageEntity, BambuLabEntity):
         """Return bytes of image."""
         return self.coordinator.get_model().cover_image.get_jpeg()
 
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Urls of the downscaled variants, for dashboards and mobile clients that don't need the full size image."""
+        url = CoverImageView.url.format(serial=self.coordinator.get_model().info.serial)
+        return {f"{variant}_url": f"{url}?size={variant}" for variant in COVER_VARIANTS}
+
     @property
     def image_last_updated(self) -> datetime | None:
         """The time when the image was last updated."""
@@ -116,7 +124,7 @@ class ChamberImage(ImageEntity, BambuLabEntity):
 
     def image(self) -> bytes | None:
         """Return bytes of image."""
-        return self.coordinator.get_model().chamber_image.get_jpeg()
+        return self.coordinator.client.request_camera_frame().jpeg
     
     @property
     def image_last_updated(self) -> datetime | None:
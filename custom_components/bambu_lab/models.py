@@ -6,7 +6,18 @@ from .const import DOMAIN, LOGGER, BRAND
 from .coordinator import BambuDataUpdateCoordinator
 
 
-class BambuLabEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
+class BambuLabCoordinatorEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
+    """Defines a base entity that is only updated when the model fields it depends on change."""
+
+    async def async_added_to_hass(self) -> None:
+        """Register with the coordinator using the entity description dependencies as the listener context."""
+        depends_on = getattr(getattr(self, "entity_description", None), "depends_on", ())
+        if len(depends_on) != 0:
+            self.coordinator_context = frozenset(depends_on)
+        await super().async_added_to_hass()
+
+
+class BambuLabEntity(BambuLabCoordinatorEntity):
     """Defines a base Bambu entity."""
 
     _attr_has_entity_name = True
@@ -17,7 +28,7 @@ class BambuLabEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
         return self.coordinator.get_printer_device()
 
 
-class AMSEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
+class AMSEntity(BambuLabCoordinatorEntity):
     """Defines a base AMS entity."""
 
     _attr_has_entity_name = True
@@ -28,7 +39,7 @@ class AMSEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
         return self.coordinator.get_ams_device(self.index)
 
 
-class VirtualTrayEntity(CoordinatorEntity[BambuDataUpdateCoordinator]):
+class VirtualTrayEntity(BambuLabCoordinatorEntity):
     """Defines an External Spool entity."""
 
     _attr_has_entity_name = True
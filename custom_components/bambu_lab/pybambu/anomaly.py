@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+
+from collections import deque
+
+from .const import LOGGER
+from .utils import get_jpeg_draft, pil_available
+
+numpy_available = False
+try:
+    import numpy as np
+    numpy_available = True
+except ImportError:
+    numpy_available = False
+
+# Frames are compared at the smallest scale the jpeg decoder offers that's at least this size.
+ANOMALY_THUMBNAIL_SIZE = (64, 48)
+ANOMALY_BATCH_SIZE = 8
+# Seconds between the frames analysed. Decoding even a 1/8 scale frame takes around a millisecond and
+# neither a stall nor spaghetti shows up within a few seconds, so frames in between are skipped unseen.
+ANOMALY_SAMPLE_INTERVAL = 5
+# Number of frame differences the rolling statistics are taken over.
+ANOMALY_WINDOW = 60
+# Mean per pixel difference between frames (0-255) below which the scene counts as unchanged.
+ANOMALY_STATIC_THRESHOLD = 1.5
+ANOMALY_STATIC_DURATION = 600
+# Median per pixel difference over the window above which the scene counts as changing chaotically.
+ANOMALY_CHAOTIC_THRESHOLD = 40.0
+
+
+class AnomalyDetector:
+    """Watches the chamber frames of a running print for a scene that stops changing or changes chaotically.
+
+    Frames are sampled every few seconds as they arrive and decoded to small grayscale thumbnails in
+    batches on a single thread shared by all printers. The mean difference between consecutive thumbnails is kept over a
+    rolling window. A print is reported stalled when that stays below the static threshold for the
+    static duration while the job is running, and chaotic when the median over a full window is above
+    the chaotic threshold while the printer says it's printing. Each is reported once per episode.
+    """
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, client, config):
+        self._client = client
+        self._batch_size = config.get('anomaly_batch_size', ANOMALY_BATCH_SIZE)
+        self._sample_interval = config.get('anomaly_sample_interval', ANOMALY_SAMPLE_INTERVAL)
+        self._static_threshold = config.get('anomaly_static_threshold', ANOMALY_STATIC_THRESHOLD)
+        self._static_duration = config.get('anomaly_static_duration', ANOMALY_STATIC_DURATION)
+        self._chaotic_threshold = config.get('anomaly_chaotic_threshold', ANOMALY_CHAOTIC_THRESHOLD)
+
+        self._lock = threading.Lock()
+        self._active = False
+        self._generation = 0
+        self._processed_generation = 0
+        self._pending = []
+        self._last_sample = None
+        self._previous = None
+        self._differences = deque(maxlen=ANOMALY_WINDOW)
+        self._last_motion = None
+        self._stalled_reported = False
+        self._chaotic_reported = False
+
+        if not numpy_available or not pil_available:
+            LOGGER.error("Anomaly detection requires numpy and Pillow to be installed.")
+
+    @classmethod
+    def _get_executor(cls) -> concurrent.futures.ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="Bambu-Anomaly")
+            return cls._executor
+
+    @property
+    def available(self) -> bool:
+        return numpy_available and pil_available
+
+    def update(self):
+        """Start or stop watching as the print job state changes. Called after each print update."""
+        if not self.available:
+            return
+        active = self._client.get_device().print_job.gcode_state == "RUNNING"
+        if active == self._active:
+            return
+
+        with self._lock:
+            self._active = active
+            self._generation += 1
+            self._pending = []
+            self._last_sample = None
+        if active:
+            # Make sure the camera keeps streaming while the print runs.
+            self._client.subscribe_camera()
+        else:
+            self._client.unsubscribe_camera()
+
+    def add_frame(self, jpeg: bytes):
+        """Queue a received chamber frame. Called on the camera thread."""
+        if not self._active:
+            return
+        with self._lock:
+            if not self._active:
+                return
+            now = time.monotonic()
+            if self._last_sample is not None and now - self._last_sample < self._sample_interval:
+                return
+            self._last_sample = now
+            self._pending.append((now, jpeg))
+            if len(self._pending) < self._batch_size:
+                return
+            batch = self._pending
+            self._pending = []
+            generation = self._generation
+        self._get_executor().submit(self._process, generation, batch)
+
+    def _process(self, generation: int, batch: list):
+        try:
+            if generation != self._generation:
+                return
+            if generation != self._processed_generation:
+                # First batch of a new print.
+                self._processed_generation = generation
+                self._previous = None
+                self._differences.clear()
+                self._last_motion = batch[0][0]
+                self._stalled_reported = False
+                self._chaotic_reported = False
+
+            thumbnails = [get_jpeg_draft(jpeg, ANOMALY_THUMBNAIL_SIZE) for _, jpeg in batch]
+            # The camera resolution doesn't change during a print, but only compare like with like if it does.
+            width, height = thumbnails[-1][1]
+            batch = [(timestamp, pixels) for (timestamp, _), (pixels, size) in zip(batch, thumbnails) if size == (width, height)]
+            pixels = b"".join(pixels for _, pixels in batch)
+            frames = np.frombuffer(pixels, dtype=np.uint8).reshape(len(batch), height, width).astype(np.int16)
+            if self._previous is not None and self._previous.shape == (height, width):
+                frames = np.concatenate((self._previous[np.newaxis], frames))
+            self._previous = frames[-1]
+            if len(frames) < 2:
+                return
+
+            differences = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+            times = [timestamp for timestamp, _ in batch[-len(differences):]]
+            moving = np.flatnonzero(differences >= self._static_threshold)
+            if len(moving) > 0:
+                self._last_motion = times[moving[-1]]
+                self._stalled_reported = False
+            self._differences.extend(differences.tolist())
+            self._evaluate(times[-1])
+        except Exception as e:
+            LOGGER.error("An exception occurred analysing chamber frames:", exc_info=e)
+
+    def _evaluate(self, now: float):
+        device = self._client.get_device()
+
+        if not self._stalled_reported and now - self._last_motion >= self._static_duration \
+                and device.print_job.gcode_state == "RUNNING":
+            LOGGER.debug(f"Chamber image unchanged for {now - self._last_motion:.0f}s while printing.")
+            self._stalled_reported = True
+            self._fire("event_print_stalled")
+
+        if len(self._differences) == self._differences.maxlen:
+            median = float(np.median(np.fromiter(self._differences, dtype=np.float64)))
+            if median < self._chaotic_threshold / 2:
+                self._chaotic_reported = False
+            elif not self._chaotic_reported and median > self._chaotic_threshold \
+                    and device.stage.description == "printing":
+                LOGGER.debug(f"Chamber image changing chaotically while printing: median difference {median:.1f}")
+                self._chaotic_reported = True
+                self._fire("event_print_chaotic")
+
+    def _fire(self, event: str):
+        if self._client.callback is not None:
+            self._client.callback(event)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
+import functools
+import logging
 import queue
 import json
 import math
 import re
+import selectors
 import socket
 import ssl
 import struct
@@ -12,6 +16,7 @@ import threading
 import time
 
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
 import paho.mqtt.client as mqtt
@@ -22,6 +27,11 @@ from .const import (
     Features,
 )
 from .models import Device, SlicerSettings
+from .timelapse import TimelapseRecorder
+from .anomaly import AnomalyDetector
+from .cloud_jobs import CloudJobQueue
+from .cover_cache import COVER_CACHE_SIZE, CoverImageCache
+from .camera_worker import CameraWorkerStream
 from .commands import (
     GET_VERSION,
     PUSH_ALL,
@@ -29,6 +39,98 @@ from .commands import (
 )
 
 
+# "json" uses the standard library. "orjson" is used when it's installed and falls back to json otherwise.
+JSON_DECODERS = ("json", "orjson")
+JSON_DECODER = "json"
+
+# "thread" runs paho's network loop on a thread per connection. "asyncio" drives every connection from the shared I/O loop.
+MQTT_TRANSPORTS = ("thread", "asyncio")
+MQTT_TRANSPORT = "thread"
+
+# Share one cloud MQTT connection between all printers on the same Bambu account.
+SHARED_CLOUD_MQTT = False
+
+# In on demand mode the chamber camera is only connected while something wants frames from it.
+CAMERA_IDLE_TIMEOUT = 60
+CAMERA_FIRST_FRAME_TIMEOUT = 5
+
+# Read every printer's chamber image stream on the shared I/O loop rather than a thread per printer.
+SHARED_CAMERA_IO = False
+
+# Read chamber image streams in a helper process so TLS decryption doesn't compete with Home Assistant.
+CAMERA_WORKER = False
+
+# Mean grayscale difference (0-255) below which a chamber frame is treated as unchanged. 0 only drops identical frames.
+CAMERA_CHANGE_THRESHOLD = 0
+
+orjson_available = False
+try:
+    import orjson
+    orjson_available = True
+except ImportError:
+    orjson_available = False
+
+
+def get_json_decoder(decoder: str):
+    """Return the loads() function used to decode mqtt payload bytes."""
+    if decoder == "orjson":
+        if orjson_available:
+            return orjson.loads
+        LOGGER.debug("orjson library is unavailable. Falling back to json.")
+    return json.loads
+
+
+WATCHDOG_TIMER = 30
+
+JPEG_START = bytearray([0xff, 0xd8, 0xff, 0xe0])
+JPEG_END = bytearray([0xff, 0xd9])
+
+
+class SharedIoLoop:
+    """A single asyncio event loop on its own thread, shared by every printer's non-blocking I/O."""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> SharedIoLoop:
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = SharedIoLoop()
+            return cls._instance
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="Bambu-IO", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        LOGGER.info("Shared I/O loop thread started.")
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop(self) -> bool:
+        return threading.get_ident() == self._thread.ident
+
+    def call(self, fn, *args):
+        """Run fn on the loop thread, directly if we are already on it."""
+        if self.in_loop():
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def run_blocking(self, fn, *args):
+        """Run a blocking call in the executor so it doesn't stall the loop."""
+        future = self.loop.run_in_executor(None, fn, *args)
+        future.add_done_callback(self._log_exception)
+        return future
+
+    @staticmethod
+    def _log_exception(future):
+        if not future.cancelled() and future.exception() is not None:
+            LOGGER.error("A blocking call on the shared I/O loop failed:", exc_info=future.exception())
+
+
 class WatchdogThread(threading.Thread):
 
     def __init__(self, client):
@@ -48,7 +150,6 @@ class WatchdogThread(threading.Thread):
 
     def run(self):
         LOGGER.info("Watchdog thread started.")
-        WATCHDOG_TIMER = 30
         while True:
             # Wait out the remainder of the watchdog delay or 1s, whichever is higher.
             interval = time.time() - self._last_received_data
@@ -67,29 +168,30 @@ class WatchdogThread(threading.Thread):
         LOGGER.info("Watchdog thread exited.")
 
 
-class ChamberImageThread(threading.Thread):
-    def __init__(self, client):
-        self._client = client
-        self._stop_event = threading.Event()
-        super().__init__()
-        self.daemon = True
-        self.setName(f"{self._client._device.info.device_type}-Chamber-{threading.get_native_id()}")
+class ChamberImageStream:
+    """Connection to the port 6000 chamber image stream of P1/A1 printers and framing of its jpeg payloads."""
 
-    def stop(self):
-        self._stop_event.set()
+    PORT = 6000
+    HEADER_SIZE = 16
+    INITIAL_BUFFER_SIZE = 256 * 1024
 
-    def run(self):
-        LOGGER.debug("Chamber image thread started.")
+    def __init__(self, hostname, access_code, on_jpeg_received):
+        self._hostname = hostname
+        self._on_jpeg_received = on_jpeg_received
+        self._sock = None
+        self.authenticated = False
 
-        auth_data = bytearray()
+        # Frames are assembled in place with recv_into. The payload buffer is reused from frame to frame
+        # and only grows if a frame is bigger than any seen so far.
+        self._header = bytearray(self.HEADER_SIZE)
+        self._header_view = memoryview(self._header)
+        self._buffer = bytearray(self.INITIAL_BUFFER_SIZE)
+        self._buffer_view = memoryview(self._buffer)
+        self._received = 0
+        self._payload_size = 0
 
         username = 'bblp'
-        access_code = self._client._access_code
-        hostname = self._client.host
-        port = 6000
-        MAX_CONNECT_ATTEMPTS = 12
-        connect_attempts = 0
-
+        auth_data = bytearray()
         auth_data += struct.pack("<I", 0x40)   # '@'\0\0\0
         auth_data += struct.pack("<I", 0x3000) # \0'0'\0\0
         auth_data += struct.pack("<I", 0)      # \0\0\0\0
@@ -102,132 +204,316 @@ class ChamberImageThread(threading.Thread):
             auth_data += struct.pack("<c", access_code[i].encode('ascii'))
         for i in range(0, 32 - len(access_code)):
             auth_data += struct.pack("<x")
+        self._auth_data = auth_data
 
-        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        ctx.check_hostname = False
-        ctx.verify_mode = ssl.CERT_NONE
-
-        jpeg_start = bytearray([0xff, 0xd8, 0xff, 0xe0])
-        jpeg_end = bytearray([0xff, 0xd9])
-
-        read_chunk_size = 4096 # 4096 is the max we'll get even if we increase this.
-
-        # Payload format for each image is:
-        # 16 byte header:
-        #   Bytes 0:3   = little endian payload size for the jpeg image (does not include this header).
-        #   Bytes 4:7   = 0x00000000
-        #   Bytes 8:11  = 0x00000001
-        #   Bytes 12:15 = 0x00000000
-        # These first 16 bytes are always delivered by themselves.
-        #
-        # Bytes 16:19                       = jpeg_start magic bytes
-        # Bytes 20:payload_size-2           = jpeg image bytes
-        # Bytes payload_size-2:payload_size = jpeg_end magic bytes
-        #
-        # Further attempts to receive data will get SSLWantReadError until a new image is ready (1-2 seconds later)
-        while connect_attempts < MAX_CONNECT_ATTEMPTS and not self._stop_event.is_set():
-            connect_attempts += 1
+        self._ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self._ctx.check_hostname = False
+        self._ctx.verify_mode = ssl.CERT_NONE
+
+    def connect(self) -> ssl.SSLSocket:
+        """Connect and authenticate, returning the non-blocking TLS socket to wait on for readability."""
+        self._received = 0
+        self._payload_size = 0
+        self.authenticated = False
+
+        sock = socket.create_connection((self._hostname, self.PORT), timeout=10)
+        try:
+            sslSock = self._ctx.wrap_socket(sock, server_hostname=self._hostname)
+            sslSock.write(self._auth_data)
+            status = sslSock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            LOGGER.debug(f"SOCKET STATUS: {status}")
+            if status != 0:
+                LOGGER.error(f"Socket error: {status}")
+        except Exception:
+            sock.close()
+            raise
+
+        sslSock.setblocking(False)
+        self._sock = sslSock
+        return sslSock
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    # Payload format for each image is:
+    # 16 byte header:
+    #   Bytes 0:3   = little endian payload size for the jpeg image (does not include this header).
+    #   Bytes 4:7   = 0x00000000
+    #   Bytes 8:11  = 0x00000001
+    #   Bytes 12:15 = 0x00000000
+    #
+    # Bytes 16:19                       = jpeg_start magic bytes
+    # Bytes 20:payload_size-2           = jpeg image bytes
+    # Bytes payload_size-2:payload_size = jpeg_end magic bytes
+    #
+    # Further attempts to receive data will get SSLWantReadError until a new image is ready (1-2 seconds later)
+    def read_available(self) -> bool:
+        """Consume everything the socket has ready. Returns False if the printer closed the connection."""
+        # TLS may already hold decrypted data beyond what the socket reported so read until it would block.
+        while True:
+            # Only ever ask for the rest of the current header or payload so frames never straddle reads.
+            if self._payload_size == 0:
+                target = self._header_view[self._received:]
+            else:
+                target = self._buffer_view[self._received:self._payload_size]
             try:
-                with socket.create_connection((hostname, port)) as sock:
-                    try:
-                        sslSock = ctx.wrap_socket(sock, server_hostname=hostname)
-                        sslSock.write(auth_data)
-                        img = None
-                        payload_size = 0
-
-                        status = sslSock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
-                        LOGGER.debug(f"SOCKET STATUS: {status}")
-                        if status != 0:
-                            LOGGER.error(f"Socket error: {status}")
-                    except socket.error as e:
-                        LOGGER.error(f"Socket error: {e}")
-                        # Sleep to allow printer to stabilize during boot when it may fail these connection attempts repeatedly.
-                        time.sleep(1)
-                        continue
-
-                    sslSock.setblocking(False)
-                    while not self._stop_event.is_set():
-                        try:
-                            dr = sslSock.recv(read_chunk_size)
-                            #LOGGER.debug(f"Received {len(dr)} bytes.")
+                count = self._sock.recv_into(target)
+            except ssl.SSLWantReadError:
+                return True
+            finally:
+                target.release()
+            if count == 0:
+                return False
+
+            self._received += count
+            if self._payload_size == 0:
+                if self._received == self.HEADER_SIZE:
+                    self._on_header()
+            elif self._received == self._payload_size:
+                self._on_payload()
+
+    def _on_header(self):
+        payload_size = int.from_bytes(self._header[0:3], byteorder='little')
+        if payload_size < len(JPEG_START) + len(JPEG_END):
+            raise ValueError(f"Unexpected image payload size: {payload_size}")
+
+        self.authenticated = True
+        if payload_size > len(self._buffer):
+            self._buffer_view.release()
+            self._buffer = bytearray(payload_size)
+            self._buffer_view = memoryview(self._buffer)
+        self._payload_size = payload_size
+        self._received = 0
+
+    def _on_payload(self):
+        payload = self._buffer_view[:self._payload_size]
+        try:
+            if payload[:4] != JPEG_START:
+                LOGGER.error("JPEG start magic bytes missing.")
+            elif payload[-2:] != JPEG_END:
+                LOGGER.error("JPEG end magic bytes missing.")
+            else:
+                # Content is as expected. Send an immutable copy as the buffer is reused for the next frame.
+                self._on_jpeg_received(payload.tobytes())
+        finally:
+            payload.release()
 
-                        except ssl.SSLWantReadError:
-                            #LOGGER.debug("SSLWantReadError")
-                            time.sleep(1)
-                            continue
+        self._payload_size = 0
+        self._received = 0
+
+
+class ChamberImageThread(threading.Thread):
+    # The printer sends a frame every 1-2 seconds so a silent connection has gone stale.
+    STALL_TIMEOUT = 30
+    MAX_CONNECT_ATTEMPTS = 12
+
+    def __init__(self, client):
+        self._client = client
+        self._stop_event = threading.Event()
+        # Writing to this wakes the selector so stop() doesn't have to wait for the next frame.
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        super().__init__()
+        self.daemon = True
+        self.setName(f"{self._client._device.info.device_type}-Chamber-{threading.get_native_id()}")
+
+    def stop(self):
+        self._stop_event.set()
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            pass
 
-                        except Exception as e:
-                            LOGGER.error("A Chamber Image thread inner exception occurred:")
-                            LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
-                            time.sleep(1)
+    def run(self):
+        LOGGER.debug("Chamber image thread started.")
+
+        stream = ChamberImageStream(self._client.host, self._client._access_code, self._client.on_jpeg_received)
+        connect_attempts = 0
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wakeup_recv, selectors.EVENT_READ)
+            while connect_attempts < self.MAX_CONNECT_ATTEMPTS and not self._stop_event.is_set():
+                connect_attempts += 1
+                try:
+                    sock = stream.connect()
+                except OSError as e:
+                    if e.errno == 113:
+                        LOGGER.debug("Host is unreachable")
+                    else:
+                        LOGGER.error("A Chamber Image thread outer exception occurred:")
+                        LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
+                    # Wait to allow printer to stabilize during boot when it may fail these connection attempts repeatedly.
+                    self._stop_event.wait(1)
+                    continue
+
+                delay = 0
+                selector.register(sock, selectors.EVENT_READ)
+                self._client._on_camera_connection(True)
+                try:
+                    while not self._stop_event.is_set():
+                        events = selector.select(timeout=self.STALL_TIMEOUT)
+                        if len(events) == 0:
+                            LOGGER.debug("No chamber image received. Reconnecting.")
+                            break
+                        if not any(key.fileobj is sock for key, _ in events):
                             continue
 
-                        if img is not None and len(dr) > 0:
-                            img += dr
-                            if len(img) > payload_size:
-                                # We got more data than we expected.
-                                LOGGER.error(f"Unexpected image payload received: {len(img)} > {payload_size}")
-                                # Reset buffer
-                                img = None
-                            elif len(img) == payload_size:
-                                # We should have the full image now.
-                                if img[:4] != jpeg_start:
-                                    LOGGER.error("JPEG start magic bytes missing.")
-                                elif img[-2:] != jpeg_end:
-                                    LOGGER.error("JPEG end magic bytes missing.")
-                                else:
-                                    # Content is as expected. Send it.
-                                    self._client.on_jpeg_received(img)
-
-                                # Reset buffer
-                                img = None
-                            # else:     
-                            # Otherwise we need to continue looping without reseting the buffer to receive the remaining data
-                            # and without delaying.
-
-                        elif len(dr) == 16:
-                            # We got the header bytes. Get the expected payload size from it and create the image buffer bytearray.
+                        if not stream.read_available():
+                            if stream.authenticated:
+                                LOGGER.debug("Chamber image connection closed by the printer.")
+                                delay = 1
+                            else:
+                                # This occurs if the wrong access code was provided.
+                                LOGGER.error("Chamber image connection rejected by the printer. Check provided access code and IP address.")
+                                delay = 5
+                            break
+
+                        if stream.authenticated:
                             # Reset connect_attempts now we know the connect was successful.
                             connect_attempts = 0
-                            img = bytearray()
-                            payload_size = int.from_bytes(dr[0:3], byteorder='little')
-
-                        elif len(dr) == 0:
-                            # This occurs if the wrong access code was provided.
-                            LOGGER.error("Chamber image connection rejected by the printer. Check provided access code and IP address.")
-                            # Sleep for a short while and then re-attempt the connection.
-                            time.sleep(5)
-                            break
 
-                        else:
-                            LOGGER.error(f"UNEXPECTED DATA RECEIVED: {len(dr)}")
-                            time.sleep(1)
+                except Exception as e:
+                    LOGGER.error("A Chamber Image thread inner exception occurred:")
+                    LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
+                    delay = 1
+
+                finally:
+                    selector.unregister(sock)
+                    stream.close()
+                    self._client._on_camera_connection(False)
+
+                if delay > 0:
+                    # Avoid a tight reconnect loop if this is a persistent error.
+                    self._stop_event.wait(delay)
 
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+        LOGGER.debug("Chamber image thread exited.")
+
+
+class ChamberImageTask:
+    """ChamberImageThread equivalent that reads the stream on the shared I/O loop, so every printer's
+    camera is multiplexed onto one thread. Has the same start/stop/join/is_alive surface."""
+
+    def __init__(self, client):
+        self._client = client
+        self._io = SharedIoLoop.get()
+        self._stop_event = threading.Event()
+        self._future = None
+        self._wakeup = None
+        self._read_result = None
+        self._last_data = 0
+        self._connect_attempts = 0
+
+    def start(self):
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self._io.loop)
+
+    def stop(self):
+        self._stop_event.set()
+        self._io.call(self._wake)
+
+    def join(self, timeout=None):
+        # Can't wait for the task from the loop it runs on. It exits as soon as the loop gets back to it.
+        if self._future is not None and not self._io.in_loop():
+            concurrent.futures.wait([self._future], timeout=timeout)
+
+    def is_alive(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _wait(self, delay):
+        self._wakeup.clear()
+        if not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_readable(self, stream):
+        try:
+            self._last_data = time.monotonic()
+            if not stream.read_available():
+                self._read_result = "closed"
+            elif stream.authenticated:
+                # Reset connect_attempts now we know the connect was successful.
+                self._connect_attempts = 0
+        except Exception as e:
+            LOGGER.error("A Chamber Image task inner exception occurred:")
+            LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
+            self._read_result = "error"
+        if self._read_result is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        LOGGER.debug("Chamber image task started.")
+        loop = self._io.loop
+        self._wakeup = asyncio.Event()
+        stream = ChamberImageStream(self._client.host, self._client._access_code, self._client.on_jpeg_received)
+        self._connect_attempts = 0
+
+        while self._connect_attempts < ChamberImageThread.MAX_CONNECT_ATTEMPTS and not self._stop_event.is_set():
+            self._connect_attempts += 1
+            try:
+                # The TCP connect and TLS handshake block so they run in the executor.
+                sock = await loop.run_in_executor(None, stream.connect)
             except OSError as e:
                 if e.errno == 113:
                     LOGGER.debug("Host is unreachable")
                 else:
-                    LOGGER.error("A Chamber Image thread outer exception occurred:")
+                    LOGGER.error("A Chamber Image task outer exception occurred:")
                     LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
-                if not self._stop_event.is_set():
-                    time.sleep(1)  # Avoid a tight loop if this is a persistent error.
+                await self._wait(1)
+                continue
+
+            delay = 0
+            fd = sock.fileno()
+            self._read_result = None
+            self._last_data = time.monotonic()
+            loop.add_reader(fd, self._on_readable, stream)
+            self._client._on_camera_connection(True)
+            try:
+                while not self._stop_event.is_set() and self._read_result is None:
+                    timeout = ChamberImageThread.STALL_TIMEOUT - (time.monotonic() - self._last_data)
+                    if timeout <= 0:
+                        LOGGER.debug("No chamber image received. Reconnecting.")
+                        break
+                    await self._wait(timeout)
+            finally:
+                loop.remove_reader(fd)
+                stream.close()
+                self._client._on_camera_connection(False)
+
+            if self._read_result == "closed":
+                if stream.authenticated:
+                    LOGGER.debug("Chamber image connection closed by the printer.")
+                    delay = 1
+                else:
+                    # This occurs if the wrong access code was provided.
+                    LOGGER.error("Chamber image connection rejected by the printer. Check provided access code and IP address.")
+                    delay = 5
+            elif self._read_result == "error":
+                delay = 1
 
-            except Exception as e:
-                LOGGER.error(f"A Chamber Image thread outer exception occurred:")
-                LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
-                if not self._stop_event.is_set():
-                    time.sleep(1)  # Avoid a tight loop if this is a persistent error.
+            if delay > 0:
+                # Avoid a tight reconnect loop if this is a persistent error.
+                await self._wait(delay)
 
-        LOGGER.debug("Chamber image thread exited.")
+        LOGGER.debug("Chamber image task exited.")
 
 
 class MqttThread(threading.Thread):
-    def __init__(self, client):
+    def __init__(self, client, name_prefix=None):
         self._client = client
         self._stop_event = threading.Event()
         super().__init__()
         self.daemon = True
-        self.setName(f"{self._client._device.info.device_type}-Mqtt-{threading.get_native_id()}")
+        if name_prefix is None:
+            name_prefix = self._client._device.info.device_type
+        self.setName(f"{name_prefix}-Mqtt-{threading.get_native_id()}")
 
     def stop(self):
         self._stop_event.set()
@@ -278,6 +564,322 @@ class MqttThread(threading.Thread):
         LOGGER.info("MQTT listener thread exited.")
 
 
+class WatchdogTask:
+    """WatchdogThread equivalent that runs as a timer on the shared I/O loop."""
+
+    def __init__(self, client):
+        self._client = client
+        self._watchdog_fired = False
+        self._last_received_data = time.time()
+        self._io = SharedIoLoop.get()
+        self._handle = None
+        self._stopped = False
+
+    def start(self):
+        self._io.call(self._schedule)
+
+    def stop(self):
+        self._stopped = True
+        self._io.call(self._cancel)
+
+    def join(self, timeout=None):
+        pass
+
+    def received_data(self):
+        self._last_received_data = time.time()
+
+    def _schedule(self):
+        if self._stopped:
+            return
+        # Wait out the remainder of the watchdog delay or 1s, whichever is higher.
+        interval = time.time() - self._last_received_data
+        wait_time = max(1, WATCHDOG_TIMER - interval)
+        self._handle = self._io.loop.call_later(wait_time, self._check)
+
+    def _cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _check(self):
+        self._handle = None
+        if self._stopped:
+            return
+        interval = time.time() - self._last_received_data
+        if not self._watchdog_fired and (interval > WATCHDOG_TIMER):
+            LOGGER.debug(f"Watchdog fired. No data received for {math.floor(interval)} seconds for {self._client._serial}.")
+            self._watchdog_fired = True
+            self._client._on_watchdog_fired()
+        elif interval < WATCHDOG_TIMER:
+            self._watchdog_fired = False
+        self._schedule()
+
+
+class AsyncioMqttTransport:
+    """Runs the paho MQTT session on the shared I/O loop instead of a dedicated listener thread.
+
+    paho's external loop API (loop_read/loop_write/loop_misc) is driven from socket readiness callbacks
+    so all printers are serviced by the one I/O thread. Has the same start/stop/join surface as MqttThread.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._mqtt_client = client.client
+        self._io = SharedIoLoop.get()
+        self._loop = self._io.loop
+        self._stop_event = threading.Event()
+        self._future = None
+        self._fd = None
+        self._misc_handle = None
+        self._disconnected = None
+
+        self._mqtt_client.on_socket_open = self._on_socket_open
+        self._mqtt_client.on_socket_close = self._on_socket_close
+        self._mqtt_client.on_socket_register_write = self._on_socket_register_write
+        self._mqtt_client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def start(self):
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    def stop(self):
+        self._stop_event.set()
+        self._io.call(self._set_disconnected)
+
+    def join(self, timeout=None):
+        if self._future is not None:
+            concurrent.futures.wait([self._future], timeout=timeout)
+
+    # paho socket callbacks. These can be called from the executor during connect so are marshalled
+    # onto the loop. The fd is captured on open as paho closes the socket straight after on_socket_close.
+    def _on_socket_open(self, client, userdata, sock):
+        self._io.call(self._add_socket, sock.fileno())
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._io.call(self._remove_socket)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._io.call(self._add_writer)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._io.call(self._remove_writer)
+
+    def _add_socket(self, fd):
+        self._fd = fd
+        self._loop.add_reader(fd, self._on_readable)
+        self._misc_handle = self._loop.call_later(1, self._on_misc)
+
+    def _remove_socket(self):
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            self._loop.remove_writer(self._fd)
+            self._fd = None
+        if self._misc_handle is not None:
+            self._misc_handle.cancel()
+            self._misc_handle = None
+        self._set_disconnected()
+
+    def _add_writer(self):
+        if self._fd is not None:
+            self._loop.add_writer(self._fd, self._on_writable)
+
+    def _remove_writer(self):
+        if self._fd is not None:
+            self._loop.remove_writer(self._fd)
+
+    def _on_readable(self):
+        # paho only reads a few packets per call. TLS may already hold decrypted records that won't make the socket
+        # readable again, so keep reading until they're used up as paho's own loop does.
+        while self._mqtt_client.loop_read() == mqtt.MQTT_ERR_SUCCESS:
+            sock = self._mqtt_client.socket()
+            if not isinstance(sock, ssl.SSLSocket) or sock.pending() == 0:
+                break
+
+    def _on_writable(self):
+        self._mqtt_client.loop_write()
+
+    def _on_misc(self):
+        # Keepalive pings and timeout detection.
+        self._misc_handle = None
+        self._mqtt_client.loop_misc()
+        if self._fd is not None:
+            self._misc_handle = self._loop.call_later(1, self._on_misc)
+
+    def _set_disconnected(self):
+        if self._disconnected is not None:
+            self._disconnected.set()
+
+    async def _run(self):
+        LOGGER.info("MQTT asyncio transport started.")
+        exceptionSeen = ""
+        # The client is replaced or cleared by BambuClient when it deliberately disconnects.
+        while not self._stop_event.is_set() and self._client.client is self._mqtt_client:
+            delay = 1
+            try:
+                host = self._client.host if self._client._local_mqtt else self._client.bambu_cloud.cloud_mqtt_host
+                LOGGER.debug(f"Connect: Attempting Connection to {host}")
+                self._disconnected = asyncio.Event()
+                # TCP connect and the TLS handshake are blocking. paho leaves the socket non-blocking afterwards.
+                await self._loop.run_in_executor(
+                    None, functools.partial(self._mqtt_client.connect, host, self._client._port, keepalive=5))
+
+                LOGGER.debug("Starting listen loop")
+                await self._disconnected.wait()
+                LOGGER.debug("Ended listen loop.")
+                exceptionSeen = ""
+            except TimeoutError as e:
+                if exceptionSeen != "TimeoutError":
+                    LOGGER.debug(f"TimeoutError: {e}.")
+                exceptionSeen = "TimeoutError"
+                delay = 5
+            except ConnectionError as e:
+                if exceptionSeen != "ConnectionError":
+                    LOGGER.debug(f"ConnectionError: {e}.")
+                exceptionSeen = "ConnectionError"
+                delay = 5
+            except OSError as e:
+                if e.errno == 113:
+                    if exceptionSeen != "OSError113":
+                        LOGGER.debug(f"OSError: {e}.")
+                    exceptionSeen = "OSError113"
+                    delay = 5
+                else:
+                    LOGGER.error("A listener loop exception occurred:")
+                    LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
+            except Exception as e:
+                LOGGER.error("A listener loop exception occurred:")
+                LOGGER.error(f"Exception. Type: {type(e)} Args: {e}")
+
+            if self._stop_event.is_set() or self._client.client is not self._mqtt_client:
+                break
+            await asyncio.sleep(delay)
+
+        self._remove_socket()
+        LOGGER.info("MQTT asyncio transport exited.")
+
+
+class CloudMqttSession:
+    """A single cloud MQTT connection shared by all printers on one Bambu account.
+
+    Each registered BambuClient uses the shared paho client to subscribe to and publish on its own
+    device topics. Received messages are routed to the matching client by the serial in the topic.
+    """
+
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, key, bambu_client):
+        self._key = key
+        self._clients = {}
+        self._connected = False
+        self._mqtt = None
+        self._mqtt_transport = bambu_client._mqtt_transport
+        # Attributes the MQTT transports read from their owner.
+        self.host = bambu_client.host
+        self.bambu_cloud = bambu_client.bambu_cloud
+        self._local_mqtt = False
+        self._port = 8883
+
+        self.client = mqtt.Client()
+        self.client.on_connect = self.on_connect
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_message = self.on_message
+        self.client.reconnect_delay_set(min_delay=1, max_delay=1)
+        self.client.username_pw_set(bambu_client._username, password=bambu_client._auth_token)
+
+    @classmethod
+    async def acquire(cls, bambu_client) -> CloudMqttSession:
+        """Register a client with its account's session, creating and starting the session if needed."""
+        key = (bambu_client.bambu_cloud.cloud_mqtt_host, bambu_client._username)
+        with cls._sessions_lock:
+            session = cls._sessions.get(key)
+            start = session is None
+            if start:
+                session = CloudMqttSession(key, bambu_client)
+                cls._sessions[key] = session
+            bambu_client.client = session.client
+            session._clients[bambu_client._serial] = bambu_client
+            already_connected = session._connected
+
+        loop = asyncio.get_event_loop()
+        if start:
+            await session._start()
+        elif already_connected:
+            # The session won't send another on_connect so bring this client up now.
+            await loop.run_in_executor(None, bambu_client._on_connect)
+        return session
+
+    def release(self, bambu_client):
+        """Unregister a client, closing the shared connection when the last one leaves."""
+        with self._sessions_lock:
+            if self._clients.get(bambu_client._serial) is not bambu_client:
+                return
+            del self._clients[bambu_client._serial]
+            was_connected = self._connected
+            last = len(self._clients) == 0
+            if last:
+                del self._sessions[self._key]
+            else:
+                # The departing client's token may be the one the session connected with.
+                self._set_credentials()
+
+        if was_connected:
+            if not last:
+                LOGGER.debug(f"Unsubscribing: device/{bambu_client._serial}/report")
+                self.client.unsubscribe(f"device/{bambu_client._serial}/report")
+            bambu_client._on_disconnect()
+        if last:
+            LOGGER.debug("Closing shared cloud MQTT session")
+            client = self.client
+            self.client = None
+            client.disconnect()
+
+    def _set_credentials(self):
+        """Reconnect with the most recently registered client's credentials. Called with the sessions lock held."""
+        bambu_client = next(reversed(self._clients.values()))
+        self.client.username_pw_set(bambu_client._username, password=bambu_client._auth_token)
+
+    def setup_tls(self):
+        self.client.tls_set(tls_version=ssl.PROTOCOL_TLS, cert_reqs=ssl.CERT_NONE)
+        self.client.tls_insecure_set(True)
+
+    async def _start(self):
+        # Run the blocking tls_set method in a separate thread
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.setup_tls)
+
+        if self._mqtt_transport == "asyncio":
+            LOGGER.debug("Starting shared cloud MQTT asyncio transport")
+            self._mqtt = AsyncioMqttTransport(self)
+        else:
+            LOGGER.debug("Starting shared cloud MQTT listener thread")
+            self._mqtt = MqttThread(self, name_prefix="Cloud")
+        self._mqtt.start()
+
+    def on_connect(self, client_, userdata, flags, result_code, properties=None):
+        with self._sessions_lock:
+            self._connected = True
+            clients = list(self._clients.values())
+        for bambu_client in clients:
+            bambu_client.on_connect(client_, userdata, flags, result_code, properties)
+
+    def on_disconnect(self, client_, userdata, result_code):
+        with self._sessions_lock:
+            self._connected = False
+            clients = list(self._clients.values())
+            if len(clients) != 0:
+                self._set_credentials()
+        for bambu_client in clients:
+            bambu_client.on_disconnect(client_, userdata, result_code)
+
+    def on_message(self, client, userdata, message):
+        # Topic is device/{serial}/report
+        topic = message.topic.split("/")
+        bambu_client = self._clients.get(topic[1]) if len(topic) == 3 else None
+        if bambu_client is not None:
+            bambu_client.on_message(client, userdata, message)
+
+
+
 @dataclass
 class BambuClient:
     """Initialize Bambu Client to connect to MQTT Broker"""
@@ -298,11 +900,36 @@ class BambuClient:
         self._usage_hours = config.get('usage_hours', 0)
         self._username = config.get('username', '')
         self._enable_camera = config.get('enable_camera', True)
+        self._camera_on_demand = config.get('camera_on_demand', False)
+        self._camera_idle_timeout = config.get('camera_idle_timeout', CAMERA_IDLE_TIMEOUT)
+        self._camera_first_frame_timeout = config.get('camera_first_frame_timeout', CAMERA_FIRST_FRAME_TIMEOUT)
+        self._camera_change_threshold = config.get('camera_change_threshold', CAMERA_CHANGE_THRESHOLD)
+        self._shared_camera_io = config.get('shared_camera_io', SHARED_CAMERA_IO)
+        self._camera_worker = config.get('camera_worker', CAMERA_WORKER)
+        self._mqtt_transport = config.get('mqtt_transport', MQTT_TRANSPORT)
+        self._shared_cloud_mqtt = config.get('shared_cloud_mqtt', SHARED_CLOUD_MQTT)
+        self._cloud_session = None
 
         self._connected = False
         self._port = 1883
+
+        self._camera_lock = threading.RLock()
+        self._camera_subscribers = 0
+        self._camera_last_demand = None
+        self._camera_idle_timer = None
+        self._camera_stats_start = time.monotonic()
+        self._camera_connected_since = None
+        self._camera_connected_time = 0
         self._refreshed = False
 
+        self._json_loads = get_json_decoder(config.get('json_decoder', JSON_DECODER))
+        # In order of precedence.
+        self._message_handlers = {
+            "event": self._on_event_message,
+            "print": self._on_print_message,
+            "info": self._on_info_message,
+        }
+
         self._device = Device(self)
         self.bambu_cloud = BambuCloud(
             config.get('region', ''),
@@ -311,6 +938,18 @@ class BambuClient:
             config.get('auth_token', '')
         )
         self.slicer_settings = SlicerSettings(self)
+        self.cloud_jobs = CloudJobQueue(self)
+        self.cover_cache = None
+        if config.get('cover_cache_directory', '') != '':
+            self.cover_cache = CoverImageCache.get(config['cover_cache_directory'], config.get('cover_cache_size', COVER_CACHE_SIZE))
+            self._device.cover_image.load_cached()
+
+        self._timelapse = None
+        if config.get('enable_timelapse', False) and self._device.supports_feature(Features.CAMERA_IMAGE):
+            self._timelapse = TimelapseRecorder(self, config)
+        self._anomaly_detector = None
+        if config.get('enable_anomaly_detection', False) and self._device.supports_feature(Features.CAMERA_IMAGE):
+            self._anomaly_detector = AnomalyDetector(self, config)
 
     @property
     def connected(self):
@@ -335,6 +974,10 @@ class BambuClient:
     def camera_enabled(self):
         return self._enable_camera
 
+    @property
+    def camera_on_demand(self):
+        return self._camera_on_demand
+
     def set_camera_enabled(self, enable):
         self._enable_camera = enable
         if self._enable_camera:
@@ -348,8 +991,14 @@ class BambuClient:
 
     async def connect(self, callback):
         """Connect to the MQTT Broker"""
-        self.client = mqtt.Client()
         self.callback = callback
+        self._port = 8883
+        if not self._local_mqtt and self._shared_cloud_mqtt:
+            LOGGER.debug("Joining shared cloud MQTT session")
+            self._cloud_session = await CloudMqttSession.acquire(self)
+            return
+
+        self.client = mqtt.Client()
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
         self.client.on_message = self.on_message
@@ -360,19 +1009,26 @@ class BambuClient:
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(None, self.setup_tls)
 
-        self._port = 8883
         if self._local_mqtt:
             self.client.username_pw_set("bblp", password=self._access_code)
         else:
             self.client.username_pw_set(self._username, password=self._auth_token)
 
-        LOGGER.debug("Starting MQTT listener thread")
-        self._mqtt = MqttThread(self)
+        if self._mqtt_transport == "asyncio":
+            LOGGER.debug("Starting MQTT asyncio transport")
+            self._mqtt = AsyncioMqttTransport(self)
+        else:
+            LOGGER.debug("Starting MQTT listener thread")
+            self._mqtt = MqttThread(self)
         self._mqtt.start()
 
     def subscribe_and_request_info(self):
         LOGGER.debug("Loading slicer settings...")
-        self.slicer_settings.update()
+        if self._mqtt_transport == "asyncio":
+            # Don't hold up every printer on the shared I/O loop with a blocking cloud request.
+            SharedIoLoop.get().run_blocking(self.slicer_settings.update)
+        else:
+            self.slicer_settings.update()
         LOGGER.debug("Now subscribing...")
         self.subscribe()
         LOGGER.debug("On Connect: Getting version info")
@@ -390,30 +1046,129 @@ class BambuClient:
         LOGGER.info("On Connect: Connected to printer")
         self._on_connect()
 
-    def _start_camera(self):
-        if not self._device.supports_feature(Features.CAMERA_RTSP):
-            if self._device.supports_feature(Features.CAMERA_IMAGE):
-                if self._enable_camera:
-                    LOGGER.debug("Starting Chamber Image thread")
-                    self._camera = ChamberImageThread(self)
-                    self._camera.start()
-            elif (self.host == "") or (self._access_code == ""):
-                LOGGER.debug("Skipping camera setup as local access details not provided.")
+    def _start_camera(self) -> bool:
+        """Start the chamber image thread if it should be running. Returns True if it was started."""
+        with self._camera_lock:
+            if self._camera is not None and self._camera.is_alive():
+                return False
+            if not self._device.supports_feature(Features.CAMERA_RTSP):
+                if self._device.supports_feature(Features.CAMERA_IMAGE):
+                    if self._enable_camera and self._camera_demanded():
+                        if self._camera_worker:
+                            LOGGER.debug("Starting Chamber Image stream in the camera worker")
+                            self._camera = CameraWorkerStream(self)
+                        elif self._shared_camera_io:
+                            LOGGER.debug("Starting Chamber Image task")
+                            self._camera = ChamberImageTask(self)
+                        else:
+                            LOGGER.debug("Starting Chamber Image thread")
+                            self._camera = ChamberImageThread(self)
+                        self._camera.start()
+                        return True
+                elif (self.host == "") or (self._access_code == ""):
+                    LOGGER.debug("Skipping camera setup as local access details not provided.")
+            return False
 
     def _stop_camera(self):
-        if self._camera is not None:
-            LOGGER.debug("Stopping camera thread")
-            self._camera.stop()
-            self._camera.join()
+        with self._camera_lock:
+            if self._camera is not None:
+                LOGGER.debug("Stopping camera thread")
+                self._camera.stop()
+                self._camera.join()
+                self._camera = None
+
+    def _camera_demanded(self) -> bool:
+        if not self._camera_on_demand or self._camera_subscribers > 0:
+            return True
+        return self._camera_last_demand is not None and time.monotonic() - self._camera_last_demand < self._camera_idle_timeout
+
+    def request_camera(self) -> bool:
+        """Note a one off demand for chamber images, keeping the camera connected for the idle timeout.
+        Returns True if the camera had to be started."""
+        if not self._camera_on_demand:
+            return False
+        with self._camera_lock:
+            self._camera_last_demand = time.monotonic()
+            started = self._connected and self._start_camera()
+            self._schedule_camera_idle_check(self._camera_idle_timeout)
+            return started
+
+    def request_camera_frame(self):
+        """Return the latest chamber image frame, waiting a bounded time for the first one if the camera
+        had to be started for it."""
+        chamber_image = self._device.chamber_image
+        received_count = chamber_image.received_count
+        if self.request_camera():
+            return chamber_image.wait_for_frame(received_count + 1, self._camera_first_frame_timeout)
+        return chamber_image.get_frame()
+
+    def subscribe_camera(self):
+        """Keep the camera connected until the matching unsubscribe_camera() call, e.g. for a live stream."""
+        with self._camera_lock:
+            self._camera_subscribers += 1
+            if self._connected:
+                self._start_camera()
+
+    def unsubscribe_camera(self):
+        with self._camera_lock:
+            self._camera_subscribers = max(0, self._camera_subscribers - 1)
+            self._camera_last_demand = time.monotonic()
+            if self._camera_on_demand and self._camera_subscribers == 0:
+                self._schedule_camera_idle_check(self._camera_idle_timeout)
+
+    def _schedule_camera_idle_check(self, delay):
+        # A pending check reschedules itself if demand was renewed in the meantime.
+        if self._camera_idle_timer is None:
+            self._camera_idle_timer = threading.Timer(delay, self._on_camera_idle_check)
+            self._camera_idle_timer.daemon = True
+            self._camera_idle_timer.start()
+
+    def _on_camera_idle_check(self):
+        with self._camera_lock:
+            self._camera_idle_timer = None
+            if self._camera_subscribers > 0:
+                return
+            idle = time.monotonic() - self._camera_last_demand
+            if idle < self._camera_idle_timeout:
+                self._schedule_camera_idle_check(self._camera_idle_timeout - idle)
+            elif self._camera is not None:
+                LOGGER.debug(f"Chamber camera idle for {math.floor(idle)} seconds.")
+                self._stop_camera()
+
+    def _on_camera_connection(self, connected: bool):
+        now = time.monotonic()
+        if connected:
+            self._camera_connected_since = now
+        elif self._camera_connected_since is not None:
+            self._camera_connected_time += now - self._camera_connected_since
+            self._camera_connected_since = None
+
+    @property
+    def camera_connected_ratio(self) -> float:
+        """Fraction of the time since startup that the chamber camera stream has been connected."""
+        now = time.monotonic()
+        connected_time = self._camera_connected_time
+        connected_since = self._camera_connected_since
+        if connected_since is not None:
+            connected_time += now - connected_since
+        elapsed = now - self._camera_stats_start
+        return connected_time / elapsed if elapsed > 0 else 0
 
     def _on_connect(self):
         self._connected = True
-        self.subscribe_and_request_info()
 
-        LOGGER.debug("Starting watchdog thread")
-        self._watchdog = WatchdogThread(self)
+        # Start the watchdog before subscribing as on a shared cloud session reports for this
+        # printer can arrive on the session's thread before we return.
+        if self._mqtt_transport == "asyncio":
+            LOGGER.debug("Starting watchdog task")
+            self._watchdog = WatchdogTask(self)
+        else:
+            LOGGER.debug("Starting watchdog thread")
+            self._watchdog = WatchdogThread(self)
         self._watchdog.start()
 
+        self.subscribe_and_request_info()
+
         self._start_camera()
 
     def try_on_connect(self,
@@ -454,44 +1209,64 @@ class BambuClient:
         self._device.info.set_online(False)
         self.publish(START_PUSH)
 
-    def on_jpeg_received(self, bytes):
-        self._device.chamber_image.set_jpeg(bytes)
+    def on_jpeg_received(self, jpeg: bytes, etag: str = None, timestamp: datetime = None):
+        self._device.chamber_image.set_jpeg(jpeg, etag, timestamp)
+        if self._timelapse is not None:
+            self._timelapse.add_frame(jpeg)
+        if self._anomaly_detector is not None:
+            self._anomaly_detector.add_frame(jpeg)
 
     def on_message(self, client, userdata, message):
         """Return the payload when received"""
         try:
-            # X1 mqtt payload is inconsistent. Adjust it for consistent logging.
-            clean_msg = re.sub(r"\\n *", "", str(message.payload))
-            if self._refreshed:
+            # Only build the cleaned up payload string if it's actually going to be logged.
+            if self._refreshed and LOGGER.isEnabledFor(logging.DEBUG):
+                # X1 mqtt payload is inconsistent. Adjust it for consistent logging.
+                clean_msg = re.sub(r"\\n *", "", str(message.payload))
                 LOGGER.debug(f"Received data: {clean_msg}")
 
-            json_data = json.loads(message.payload)
-            if json_data.get("event"):
-                # These are events from the bambu cloud mqtt feed and allow us to detect when a local
-                # device has connected/disconnected (e.g. turned on/off)
-                if json_data.get("event").get("event") == "client.connected":
-                    LOGGER.debug("Client connected event received.")
-                    self._on_disconnect() # We aren't guaranteed to recieve a client.disconnected event.
-                    self._on_connect()
-                elif json_data.get("event").get("event") == "client.disconnected":
-                    LOGGER.debug("Client disconnected event received.")
-                    self._on_disconnect()
-            else:
+            json_data = self._json_loads(message.payload)
+            if not json_data.get("event"):
                 self._device.info.set_online(True)
                 self._watchdog.received_data()
-                if json_data.get("print"):
-                    self._device.print_update(data=json_data.get("print"))
-                    # Once we receive data, if in manual refresh mode, we disconnect again.
-                    if self._manual_refresh_mode:
-                        self.disconnect()
-                    if json_data.get("print").get("msg", 0) == 0:
-                        self._refreshed= False
-                elif json_data.get("info") and json_data.get("info").get("command") == "get_version":
-                    LOGGER.debug("Got Version Data")
-                    self._device.info_update(data=json_data.get("info"))
+
+            # Only the first key present in handler order is handled, so an event always wins over print data.
+            for key, handler in self._message_handlers.items():
+                value = json_data.get(key)
+                if value:
+                    handler(value)
+                    break
         except Exception as e:
             LOGGER.error("An exception occurred processing a message:", exc_info=e)
 
+    def _on_event_message(self, event):
+        # These are events from the bambu cloud mqtt feed and allow us to detect when a local
+        # device has connected/disconnected (e.g. turned on/off)
+        if event.get("event") == "client.connected":
+            LOGGER.debug("Client connected event received.")
+            self._on_disconnect() # We aren't guaranteed to recieve a client.disconnected event.
+            self._on_connect()
+        elif event.get("event") == "client.disconnected":
+            LOGGER.debug("Client disconnected event received.")
+            self._on_disconnect()
+
+    def _on_print_message(self, data):
+        self._device.print_update(data=data)
+        if self._timelapse is not None:
+            self._timelapse.update()
+        if self._anomaly_detector is not None:
+            self._anomaly_detector.update()
+        # Once we receive data, if in manual refresh mode, we disconnect again.
+        if self._manual_refresh_mode:
+            self.disconnect()
+        if data.get("msg", 0) == 0:
+            self._refreshed= False
+
+    def _on_info_message(self, data):
+        if data.get("command") == "get_version":
+            LOGGER.debug("Got Version Data")
+            self._device.info_update(data=data)
+
     def subscribe(self):
         """Subscribe to report topic"""
         LOGGER.debug(f"Subscribing: device/{self._serial}/report")
@@ -530,7 +1305,15 @@ class BambuClient:
     def disconnect(self):
         """Disconnect the Bambu Client from server"""
         LOGGER.debug(" Disconnect: Client Disconnecting")
-        if self.client is not None:
+        if self.cover_cache is not None:
+            self.cover_cache.flush()
+        if self._cloud_session is not None:
+            # Leave the shared session rather than closing the connection for the whole account.
+            session = self._cloud_session
+            self._cloud_session = None
+            self.client = None
+            session.release(self)
+        elif self.client is not None:
             self.client.disconnect()
             self.client = None
 
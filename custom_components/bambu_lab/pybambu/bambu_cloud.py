@@ -3,10 +3,14 @@ from enum import (
     Enum,
 )
 
+import asyncio
 import base64
 import cloudscraper
+import functools
 import json
 import requests
+import threading
+import time
 
 class ConnectionMechanismEnum(Enum):
     CLOUDSCRAPER = 1,
@@ -33,6 +37,15 @@ from .const import (
 from .utils import get_Url
 
 IMPERSONATE_BROWSER='chrome'
+REQUEST_TIMEOUT = 10
+DOWNLOAD_TIMEOUT = 30
+TASK_CACHE_TTL = 300
+TASK_CACHE_INCREMENTAL_LIMIT = 10
+TASK_CACHE_TASKS_PER_DEVICE = 20
+# After a failed task list fetch callers get the cached tasks for this long rather than each retrying it.
+TASK_CACHE_FAILURE_BACKOFF = 30
+# A print that has just started needs a task list fetched since. This still lets a burst of starts share one fetch.
+TASK_CACHE_PRINT_START_MAX_AGE = 5
 
 class CloudflareError(Exception):
     def __init__(self):
@@ -64,9 +77,91 @@ class CurlUnavailableError(Exception):
         super().__init__("curl library unavailable")
         self.error_code = 400
 
+class TaskCache:
+    """Account wide copy of the cloud task list, indexed by deviceId with each printer's tasks newest first.
+
+    Refreshes are single flight: callers arriving while one is in progress wait for it and then use its
+    result, including a failure: a failed refresh isn't retried for a short while, so an outage costs one
+    request rather than one per waiting caller. After the first full download only the most recent tasks are fetched and merged by task id,
+    falling back to a full download if all of them are new as older ones may then have been missed.
+    """
+
+    def __init__(self):
+        self._refresh_lock = threading.Lock()
+        self._tasks = {}
+        self._tasks_by_device = {}
+        self._newest_id = None
+        self._refreshed = None
+        self._failed_at = None
+
+    def is_fresh(self, max_age: float) -> bool:
+        return self._refreshed is not None and time.monotonic() - self._refreshed <= max_age
+
+    def _needs_refresh(self, max_age: float) -> bool:
+        if self.is_fresh(max_age):
+            return False
+        return self._failed_at is None or time.monotonic() - self._failed_at > TASK_CACHE_FAILURE_BACKOFF
+
+    def get_tasks(self, cloud: BambuCloud, deviceId: str, max_age: float) -> list:
+        if self._needs_refresh(max_age):
+            with self._refresh_lock:
+                if self._needs_refresh(max_age):
+                    self._refresh(cloud)
+        return self._tasks_by_device.get(deviceId, [])
+
+    def _refresh(self, cloud: BambuCloud):
+        started = time.monotonic()
+        if self._newest_id is not None:
+            data = cloud.get_tasklist(limit=TASK_CACHE_INCREMENTAL_LIMIT)
+            if data is None:
+                self._refresh_failed(started)
+                return
+            hits = data.get('hits', [])
+            if len(hits) == 0 or any(hit['id'] <= self._newest_id for hit in hits):
+                LOGGER.debug(f"Task cache merged {sum(hit['id'] > self._newest_id for hit in hits)} new tasks")
+                self._merge(self._tasks, hits)
+                self._refreshed = started
+                self._failed_at = None
+                return
+
+        data = cloud.get_tasklist()
+        if data is None:
+            self._refresh_failed(started)
+            return
+        self._merge({}, data.get('hits', []))
+        self._refreshed = started
+        self._failed_at = None
+
+    def _refresh_failed(self, started: float):
+        LOGGER.debug(f"Task cache refresh failed, not retrying for {TASK_CACHE_FAILURE_BACKOFF}s")
+        self._failed_at = started
+
+    def _merge(self, tasks: dict, hits: list):
+        tasks = {**tasks, **{hit['id']: hit for hit in hits}}
+        tasks_by_device = {}
+        for task in sorted(tasks.values(), key=lambda task: task['id'], reverse=True):
+            device_tasks = tasks_by_device.setdefault(task['deviceId'], [])
+            if len(device_tasks) < TASK_CACHE_TASKS_PER_DEVICE:
+                device_tasks.append(task)
+        # Swap in the new index whole so lookups never need the lock.
+        self._tasks = {task['id']: task for device_tasks in tasks_by_device.values() for task in device_tasks}
+        self._tasks_by_device = tasks_by_device
+        if len(self._tasks) != 0:
+            self._newest_id = max(self._tasks)
+
+
 @dataclass
 class BambuCloud:
-  
+
+    # Long-lived sessions shared by every BambuCloud instance for the same account so connections
+    # (and any Cloudflare clearance) are reused across requests instead of renegotiated each time.
+    # None of the session backends are safe to use from several threads at once, so each thread gets
+    # its own. A lock per session would do too, but would queue up the cloud job workers and executor
+    # threads behind a single connection, and there are only ever a handful of those threads.
+    _sessions = threading.local()
+    _task_caches = {}
+    _sessions_lock = threading.Lock()
+
     def __init__(self, region: str, email: str, username: str, auth_token: str):
         self._region = region
         self._email = email
@@ -119,25 +214,51 @@ class BambuCloud:
 
         LOGGER.debug(f"Response: {response.status_code}")
 
-    def _get(self, urlenum: BambuUrl):
+    def _get_account_key(self):
+        return (self._region, self._email or self._username)
+
+    def _get_task_cache(self) -> TaskCache:
+        with BambuCloud._sessions_lock:
+            key = self._get_account_key()
+            task_cache = BambuCloud._task_caches.get(key)
+            if task_cache is None:
+                task_cache = BambuCloud._task_caches[key] = TaskCache()
+            return task_cache
+
+    @staticmethod
+    def _get_thread_sessions() -> dict:
+        sessions = getattr(BambuCloud._sessions, 'sessions', None)
+        if sessions is None:
+            sessions = BambuCloud._sessions.sessions = {}
+        return sessions
+
+    def _get_session(self):
+        key = (CONNECTION_MECHANISM, *self._get_account_key())
+        sessions = BambuCloud._get_thread_sessions()
+        session = sessions.get(key)
+        if session is None:
+            if CONNECTION_MECHANISM == ConnectionMechanismEnum.CURL_CFFI:
+                if not curl_available:
+                    LOGGER.debug(f"Curl library is unavailable.")
+                    raise CurlUnavailableError()
+                session = curl_requests.Session(impersonate=IMPERSONATE_BROWSER)
+            elif CONNECTION_MECHANISM == ConnectionMechanismEnum.CLOUDSCRAPER:
+                session = cloudscraper.create_scraper()
+            elif CONNECTION_MECHANISM == ConnectionMechanismEnum.REQUESTS:
+                session = requests.Session()
+            else:
+                raise NotImplementedError()
+            LOGGER.debug("Created Bambu Cloud session")
+            sessions[key] = session
+        return session
+
+    def _get(self, urlenum: BambuUrl, params: dict = None):
         url = get_Url(urlenum, self._region)
         headers=self._get_headers_with_auth_token()
-        if CONNECTION_MECHANISM == ConnectionMechanismEnum.CURL_CFFI:
-            if not curl_available:
-                LOGGER.debug(f"Curl library is unavailable.")
-                raise CurlUnavailableError()
-            response = curl_requests.get(url, headers=headers, timeout=10, impersonate=IMPERSONATE_BROWSER)
-        elif CONNECTION_MECHANISM == ConnectionMechanismEnum.CLOUDSCRAPER:
-            if len(headers) == 0:
-                headers = self._get_headers()
-            scraper = cloudscraper.create_scraper()
-            response = scraper.get(url, headers=headers, timeout=10)
-        elif CONNECTION_MECHANISM == ConnectionMechanismEnum.REQUESTS:
-            if len(headers) == 0:
-                headers = self._get_headers()
-            response = requests.get(url, headers=headers, timeout=10)
-        else:
-            raise NotImplementedError()
+        session = self._get_session()
+        if CONNECTION_MECHANISM != ConnectionMechanismEnum.CURL_CFFI and len(headers) == 0:
+            headers = self._get_headers()
+        response = session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
 
         self._test_response(response)
 
@@ -146,22 +267,10 @@ class BambuCloud:
 
     def _post(self, urlenum: BambuUrl, json: str, headers={}, return400=False):
         url = get_Url(urlenum, self._region)
-        if CONNECTION_MECHANISM == ConnectionMechanismEnum.CURL_CFFI:
-            if not curl_available:
-                LOGGER.debug(f"Curl library is unavailable.")
-                raise CurlUnavailableError()
-            response = curl_requests.post(url, headers=headers, json=json, impersonate=IMPERSONATE_BROWSER)
-        elif CONNECTION_MECHANISM == ConnectionMechanismEnum.CLOUDSCRAPER:
-            if len(headers) == 0:
-                headers = self._get_headers()
-            scraper = cloudscraper.create_scraper()
-            response = scraper.post(url, headers=headers, json=json)
-        elif CONNECTION_MECHANISM == ConnectionMechanismEnum.REQUESTS:
-            if len(headers) == 0:
-                headers = self._get_headers()
-            response = requests.post(url, headers=headers, json=json)
-        else:
-            raise NotImplementedError()
+        session = self._get_session()
+        if CONNECTION_MECHANISM != ConnectionMechanismEnum.CURL_CFFI and len(headers) == 0:
+            headers = self._get_headers()
+        response = session.post(url, headers=headers, json=json, timeout=REQUEST_TIMEOUT)
 
         self._test_response(response, return400)
         
@@ -497,10 +606,10 @@ class BambuCloud:
     #     "bedType": "textured_plate"
     #     },
 
-    def get_tasklist(self) -> dict:
-        LOGGER.debug("Getting full task list from Bambu Cloud")
+    def get_tasklist(self, limit: int = None) -> dict:
+        LOGGER.debug("Getting full task list from Bambu Cloud" if limit is None else f"Getting latest {limit} tasks from Bambu Cloud")
         try:
-            response = self._get(BambuUrl.TASKS)
+            response = self._get(BambuUrl.TASKS, params=None if limit is None else {'limit': limit})
         except:
             return None
         return response.json()
@@ -532,10 +641,10 @@ class BambuCloud:
             return None
         return response.json()
 
-    def get_latest_task_for_printer(self, deviceId: str) -> dict:
+    def get_latest_task_for_printer(self, deviceId: str, max_age: float = TASK_CACHE_TTL) -> dict:
         LOGGER.debug(f"Getting latest task for printer from Bambu Cloud")
         try:
-            data = self.get_tasklist_for_printer(deviceId)
+            data = self.get_tasklist_for_printer(deviceId, max_age)
             if len(data) != 0:
                 return data[0]
             LOGGER.debug("No tasks found for printer")
@@ -543,14 +652,9 @@ class BambuCloud:
         except:
             return None
 
-    def get_tasklist_for_printer(self, deviceId: str) -> dict:
-        LOGGER.debug(f"Getting full task list for printer from Bambu Cloud")
-        tasks = []
-        data = self.get_tasklist()
-        for task in data['hits']:
-            if task['deviceId'] == deviceId:
-                tasks.append(task)
-        return tasks
+    def get_tasklist_for_printer(self, deviceId: str, max_age: float = TASK_CACHE_TTL) -> list:
+        """Tasks for the printer, newest first, from the account's task cache if it's no older than max_age seconds."""
+        return self._get_task_cache().get_tasks(self, deviceId, max_age)
 
     def get_device_type_from_device_product_name(self, device_product_name: str):
         if device_product_name == "X1 Carbon":
@@ -559,13 +663,52 @@ class BambuCloud:
 
     def download(self, url: str) -> bytearray:
         LOGGER.debug(f"Downloading cover image: {url}")
+        sessions = BambuCloud._get_thread_sessions()
+        session = sessions.get('download')
+        if session is None:
+            session = sessions['download'] = requests.Session()
         try:
             # This is just a standard download from an unauthenticated end point.
-            response = requests.get(url)
-        except:
+            response = session.get(url, timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            LOGGER.debug(f"Cover image download failed: {e}")
             return None
         return response.content
 
+    # Async versions of the public API for callers on an event loop. The session backends are synchronous
+    # so the request itself runs in the default executor, still on the pooled session.
+
+    async def _run_async(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    async def async_test_authentication(self, region: str, email: str, username: str, auth_token: str) -> bool:
+        return await self._run_async(self.test_authentication, region, email, username, auth_token)
+
+    async def async_login(self, region: str, email: str, password: str):
+        return await self._run_async(self.login, region, email, password)
+
+    async def async_login_with_verification_code(self, code: str):
+        return await self._run_async(self.login_with_verification_code, code)
+
+    async def async_login_with_2fa_code(self, code: str):
+        return await self._run_async(self.login_with_2fa_code, code)
+
+    async def async_get_device_list(self) -> dict:
+        return await self._run_async(self.get_device_list)
+
+    async def async_get_slicer_settings(self) -> dict:
+        return await self._run_async(self.get_slicer_settings)
+
+    async def async_get_tasklist(self) -> dict:
+        return await self._run_async(self.get_tasklist)
+
+    async def async_get_latest_task_for_printer(self, deviceId: str, max_age: float = TASK_CACHE_TTL) -> dict:
+        return await self._run_async(self.get_latest_task_for_printer, deviceId, max_age)
+
+    async def async_download(self, url: str) -> bytearray:
+        return await self._run_async(self.download, url)
+
     @property
     def username(self):
         return self._username
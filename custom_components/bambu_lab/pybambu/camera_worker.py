@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from datetime import datetime
+
+from .const import LOGGER
+
+# Messages from the worker are a fixed header followed by the printer id and the payload:
+#   type (1 byte), id length (2 bytes), timestamp (8 byte double), payload length (4 bytes), blake2b-128 digest (16 bytes)
+MESSAGE_HEADER = struct.Struct("<BHdI16s")
+MESSAGE_FRAME = 1
+MESSAGE_CONNECTED = 2
+MESSAGE_DISCONNECTED = 3
+MESSAGE_ENDED = 4
+
+# Runs main() below in a fresh interpreter with just pybambu importable, not Home Assistant. The package is
+# loaded by location as putting the integration directory on sys.path would let its select.py shadow the stdlib.
+BOOTSTRAP = (
+    "import sys, importlib.util;"
+    "spec = importlib.util.spec_from_file_location('pybambu', sys.argv[1] + '/__init__.py', submodule_search_locations=[sys.argv[1]]);"
+    "module = importlib.util.module_from_spec(spec); sys.modules['pybambu'] = module; spec.loader.exec_module(module);"
+    "from pybambu.camera_worker import main; main()"
+)
+
+
+class CameraWorker:
+    """A helper process that reads the chamber image streams of all printers.
+
+    TLS decryption and frame assembly happen in the worker. Finished frames come back over its stdout
+    pipe along with their receive time and content digest, and are dispatched to the owning client by
+    a single reader thread.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> CameraWorker:
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = CameraWorker()
+            return cls._instance
+
+    def __init__(self):
+        package_path = os.path.dirname(os.path.abspath(__file__))
+        LOGGER.debug("Starting camera worker process")
+        self._process = subprocess.Popen(
+            [sys.executable, "-c", BOOTSTRAP, package_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self._write_lock = threading.Lock()
+        self._streams = {}
+        self._reader = threading.Thread(target=self._read_messages, name="Bambu-CameraWorker", daemon=True)
+        self._reader.start()
+
+    def start_stream(self, stream: CameraWorkerStream):
+        client = stream._client
+        self._streams[client._serial] = stream
+        self._send({"cmd": "start", "id": client._serial, "host": client.host, "access_code": client._access_code})
+
+    def stop_stream(self, stream: CameraWorkerStream):
+        serial = stream._client._serial
+        if self._streams.get(serial) is stream:
+            del self._streams[serial]
+            self._send({"cmd": "stop", "id": serial})
+
+    def _send(self, command: dict):
+        try:
+            with self._write_lock:
+                self._process.stdin.write(json.dumps(command).encode() + b"\n")
+                self._process.stdin.flush()
+        except OSError as e:
+            LOGGER.error(f"Unable to send command to the camera worker: {e}")
+
+    def _read_messages(self):
+        stdout = self._process.stdout
+        try:
+            while True:
+                header = stdout.read(MESSAGE_HEADER.size)
+                if len(header) < MESSAGE_HEADER.size:
+                    break
+                message_type, id_length, timestamp, payload_length, digest = MESSAGE_HEADER.unpack(header)
+                serial = stdout.read(id_length).decode()
+                payload = stdout.read(payload_length) if payload_length > 0 else b""
+                stream = self._streams.get(serial)
+                if stream is not None:
+                    stream._on_message(message_type, timestamp, digest, payload)
+        except Exception as e:
+            LOGGER.error("A camera worker reader exception occurred:", exc_info=e)
+
+        LOGGER.error(f"Camera worker process exited with code {self._process.wait()}")
+        with self._instance_lock:
+            if CameraWorker._instance is self:
+                CameraWorker._instance = None
+        for stream in list(self._streams.values()):
+            stream._on_message(MESSAGE_ENDED, time.time(), b"", b"")
+
+
+class CameraWorkerStream:
+    """Per printer handle on the camera worker with the same start/stop/join/is_alive surface as ChamberImageThread."""
+
+    def __init__(self, client):
+        self._client = client
+        self._worker = None
+        self._alive = False
+
+    def start(self):
+        self._alive = True
+        self._worker = CameraWorker.get()
+        self._worker.start_stream(self)
+
+    def stop(self):
+        self._alive = False
+        if self._worker is not None:
+            self._worker.stop_stream(self)
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self) -> bool:
+        return self._alive
+
+    def _on_message(self, message_type, timestamp, digest, payload):
+        if message_type == MESSAGE_FRAME:
+            self._client.on_jpeg_received(payload, etag=digest.hex(), timestamp=datetime.fromtimestamp(timestamp))
+        elif message_type == MESSAGE_CONNECTED:
+            self._client._on_camera_connection(True)
+        elif message_type == MESSAGE_DISCONNECTED:
+            self._client._on_camera_connection(False)
+        elif message_type == MESSAGE_ENDED:
+            # The worker gave up connecting or exited. Allow the client to start the stream again.
+            self._alive = False
+            self._client._on_camera_connection(False)
+
+
+class _WorkerCamera:
+    """Stands in for BambuClient in the worker process, forwarding a ChamberImageTask's output to the parent."""
+
+    def __init__(self, serial, host, access_code, writer):
+        self._serial = serial
+        self.host = host
+        self._access_code = access_code
+        self._writer = writer
+
+    def on_jpeg_received(self, jpeg: bytes):
+        digest = hashlib.blake2b(jpeg, digest_size=16).digest()
+        self._writer.write(MESSAGE_FRAME, self._serial, digest, jpeg)
+
+    def _on_camera_connection(self, connected: bool):
+        self._writer.write(MESSAGE_CONNECTED if connected else MESSAGE_DISCONNECTED, self._serial)
+
+
+class _MessageWriter:
+    def __init__(self, out):
+        self._out = out
+        self._lock = threading.Lock()
+
+    def write(self, message_type, serial, digest=bytes(16), payload=b""):
+        serial = serial.encode()
+        header = MESSAGE_HEADER.pack(message_type, len(serial), time.time(), len(payload), digest)
+        with self._lock:
+            self._out.write(header)
+            self._out.write(serial)
+            if len(payload) > 0:
+                self._out.write(payload)
+            self._out.flush()
+
+
+def main():
+    """Worker process entry point. Reads start/stop commands from stdin until the parent closes it."""
+    from .bambu_client import ChamberImageTask
+
+    # stdout carries frames so make sure nothing else can write to it.
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    logging.basicConfig(level=logging.WARNING)
+    writer = _MessageWriter(out)
+
+    tasks = {}
+
+    def on_task_done(serial, task):
+        if tasks.get(serial) is task:
+            writer.write(MESSAGE_ENDED, serial)
+
+    for line in sys.stdin.buffer:
+        try:
+            command = json.loads(line)
+            serial = command["id"]
+            if command["cmd"] == "start":
+                task = tasks.get(serial)
+                if task is not None and task.is_alive():
+                    continue
+                task = ChamberImageTask(_WorkerCamera(serial, command["host"], command["access_code"], writer))
+                tasks[serial] = task
+                task.start()
+                task._future.add_done_callback(lambda _, serial=serial, task=task: on_task_done(serial, task))
+            elif command["cmd"] == "stop":
+                task = tasks.pop(serial, None)
+                if task is not None:
+                    task.stop()
+        except Exception as e:
+            LOGGER.error("A camera worker command exception occurred:", exc_info=e)
+
+    # The parent has gone away.
+    for task in tasks.values():
+        task.stop()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+
+from .const import LOGGER
+
+CLOUD_JOB_TIMEOUT = 60
+CLOUD_JOB_IDLE_TIMEOUT = 30
+
+
+class CloudJob:
+    """A queued Bambu Cloud request and the merge of its result into the model."""
+
+    def __init__(self, key: str, fn, timeout: float):
+        self.key = key
+        self._fn = fn
+        self._deadline = time.monotonic() + timeout
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() > self._deadline
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        self._fn(self)
+
+
+class CloudJobQueue:
+    """Runs one printer's Bambu Cloud requests in order on a worker thread so message handling never waits on HTTP.
+
+    Jobs are keyed by what they fetch. Submitting a job cancels the queued or running job with the same key:
+    a queued one is skipped and a running one is expected to check `cancelled` before merging its result, as
+    the request itself can only be cut short by its HTTP timeout. A job still queued after its timeout is
+    dropped. The worker thread exits once the queue has been idle for a while and is restarted on demand.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self._queue = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, key: str, fn, timeout: float = CLOUD_JOB_TIMEOUT) -> CloudJob:
+        job = CloudJob(key, fn, timeout)
+        with self._lock:
+            previous = self._jobs.get(key)
+            if previous is not None:
+                LOGGER.debug(f"Cancelling superseded cloud job '{key}'")
+                previous.cancel()
+            self._jobs[key] = job
+            self._queue.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.name = f"{self._client._device.info.device_type}-CloudJobs-{threading.get_native_id()}"
+                self._thread.start()
+        return job
+
+    def cancel(self, key: str):
+        with self._lock:
+            job = self._jobs.pop(key, None)
+            if job is not None:
+                job.cancel()
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=CLOUD_JOB_IDLE_TIMEOUT)
+            except queue.Empty:
+                with self._lock:
+                    # Only exit if nothing was submitted since the wait timed out.
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            try:
+                if job.cancelled:
+                    continue
+                if job.expired:
+                    LOGGER.debug(f"Cloud job '{job.key}' expired before it could run")
+                    continue
+                job.run()
+            except Exception as e:
+                LOGGER.error(f"An exception occurred running cloud job '{job.key}':", exc_info=e)
+            finally:
+                with self._lock:
+                    if self._jobs.get(job.key) is job:
+                        del self._jobs[job.key]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+from .const import LOGGER
+
+COVER_CACHE_SIZE = 32 * 1024 * 1024
+COVER_CACHE_INDEX = "index.json"
+# Hits only change the LRU order, so the index is written for them at most this often in seconds.
+COVER_CACHE_INDEX_FLUSH_INTERVAL = 300
+# Bounding box of each downscaled variant served in place of the full size cover.
+COVER_VARIANTS = {
+    "thumbnail": (128, 128),
+    "medium": (512, 512),
+}
+
+
+def get_cover_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def get_cover_url_key(url: str) -> str:
+    """Cover URLs are signed with an expiring query string so only the path identifies the image."""
+    parts = urlsplit(url)
+    return f"url:{parts.netloc}{parts.path}"
+
+
+class CoverImageCache:
+    """Content addressed LRU cache of cover images on disk, shared by all printers using the same directory.
+
+    Each image is stored once under the hash of its content. A persisted index maps keys (task id, cover URL
+    and the printer's last cover) to those hashes and records when each image was last used, so the LRU
+    order and the lookups survive a restart. Cache hits update the index in memory and it's written out lazily,
+with any change that adds or removes files, or once hits have gone unsaved for a while. Images are evicted least recently used first once the total
+    size is over budget. Downscaled variants are stored next to their original and evicted with it.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, directory: str, size_limit: int = COVER_CACHE_SIZE) -> CoverImageCache:
+        with cls._instances_lock:
+            cache = cls._instances.get(directory)
+            if cache is None:
+                cache = cls._instances[directory] = CoverImageCache(directory, size_limit)
+            else:
+                # Pick up a size changed in the options when the entry is reloaded.
+                cache._size_limit = size_limit
+            return cache
+
+    def __init__(self, directory: str, size_limit: int):
+        self._directory = directory
+        self._size_limit = size_limit
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._files = {}
+        self._loaded = False
+        self._saved = time.monotonic()
+        self._dirty = False
+
+    def get_image(self, *keys: str) -> bytes | None:
+        """Return the image stored under the first of the keys found, or None."""
+        with self._lock:
+            self._load()
+            for key in keys:
+                digest = self._keys.get(key)
+                if digest is None or digest not in self._files:
+                    continue
+                try:
+                    with open(self._get_path(digest), "rb") as file:
+                        data = file.read()
+                except OSError:
+                    LOGGER.debug(f"Cover cache file missing for '{key}'")
+                    del self._files[digest]
+                    continue
+                # Make sure the other keys find it next time too.
+                for other_key in keys:
+                    self._keys[other_key] = digest
+                self._files[digest]["used"] = time.time()
+                self._dirty = True
+                if time.monotonic() - self._saved >= COVER_CACHE_INDEX_FLUSH_INTERVAL:
+                    self._save_index()
+                return data
+        return None
+
+    def put_image(self, keys: list[str], data: bytes):
+        digest = get_cover_digest(data)
+        with self._lock:
+            self._load()
+            if digest not in self._files:
+                path = self._get_path(digest)
+                try:
+                    with open(f"{path}.tmp", "wb") as file:
+                        file.write(data)
+                    os.replace(f"{path}.tmp", path)
+                except OSError as e:
+                    LOGGER.error(f"Unable to write cover image to the cache: {e}")
+                    return
+                self._files[digest] = {"size": len(data)}
+            self._files[digest]["used"] = time.time()
+            for key in keys:
+                self._keys[key] = digest
+            self._evict()
+            self._save_index()
+
+    def get_variant(self, digest: str, variant: str) -> bytes | None:
+        with self._lock:
+            self._load()
+            file = self._files.get(digest)
+            if file is None or variant not in file.get("variants", {}):
+                return None
+            try:
+                with open(self._get_path(digest, variant), "rb") as f:
+                    return f.read()
+            except OSError:
+                LOGGER.debug(f"Cover cache file missing for the {variant} variant")
+                del file["variants"][variant]
+                return None
+
+    def put_variant(self, digest: str, variant: str, data: bytes):
+        """Store a variant of an image already in the cache. Ignored if the original has been evicted."""
+        with self._lock:
+            self._load()
+            file = self._files.get(digest)
+            if file is None:
+                return
+            path = self._get_path(digest, variant)
+            try:
+                with open(f"{path}.tmp", "wb") as f:
+                    f.write(data)
+                os.replace(f"{path}.tmp", path)
+            except OSError as e:
+                LOGGER.error(f"Unable to write cover image variant to the cache: {e}")
+                return
+            file.setdefault("variants", {})[variant] = len(data)
+            self._evict()
+            self._save_index()
+
+    def _get_path(self, digest: str, variant: str | None = None) -> str:
+        if variant is None:
+            return os.path.join(self._directory, f"{digest}.img")
+        return os.path.join(self._directory, f"{digest}.{variant}.img")
+
+    @staticmethod
+    def _get_size(file: dict) -> int:
+        return file["size"] + sum(file.get("variants", {}).values())
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self._directory, exist_ok=True)
+        try:
+            with open(os.path.join(self._directory, COVER_CACHE_INDEX), "r") as file:
+                index = json.load(file)
+            self._keys = index["keys"]
+            self._files = index["files"]
+        except (OSError, ValueError, KeyError):
+            # No usable index. Keep any images already on disk so they can still be evicted.
+            self._keys = {}
+            self._files = {}
+            variants = []
+            for entry in os.scandir(self._directory):
+                if entry.name.endswith(".img"):
+                    stat = entry.stat()
+                    digest, _, variant = entry.name[:-4].partition(".")
+                    if variant == "":
+                        self._files[digest] = {"size": stat.st_size, "used": stat.st_mtime}
+                    else:
+                        variants.append((digest, variant, stat.st_size))
+            for digest, variant, size in variants:
+                if digest in self._files:
+                    self._files[digest].setdefault("variants", {})[variant] = size
+                else:
+                    try:
+                        os.remove(self._get_path(digest, variant))
+                    except OSError:
+                        pass
+        LOGGER.debug(f"Cover cache loaded with {len(self._files)} images")
+
+    def _evict(self):
+        total = sum(self._get_size(file) for file in self._files.values())
+        if total <= self._size_limit:
+            return
+        for digest, file in sorted(self._files.items(), key=lambda item: item[1]["used"]):
+            if total <= self._size_limit:
+                break
+            for variant in [None, *file.get("variants", {})]:
+                try:
+                    os.remove(self._get_path(digest, variant))
+                except OSError:
+                    pass
+            del self._files[digest]
+            total -= self._get_size(file)
+        self._keys = {key: digest for key, digest in self._keys.items() if digest in self._files}
+
+    def flush(self):
+        """Write out index changes from cache hits that haven't been saved yet."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _save_index(self):
+        self._saved = time.monotonic()
+        self._dirty = False
+        path = os.path.join(self._directory, COVER_CACHE_INDEX)
+        try:
+            with open(f"{path}.tmp", "w") as file:
+                json.dump({"keys": self._keys, "files": self._files}, file)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            LOGGER.error(f"Unable to save the cover cache index: {e}")
@@ -1,3 +1,5 @@
+import functools
+import hashlib
 import math
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -5,6 +7,7 @@ from dateutil import parser, tz
 from packaging import version
 from pathlib import Path
 import os
+import threading
 
 from .utils import (
     search,
@@ -24,7 +27,12 @@ from .utils import (
     get_HMS_severity,
     get_HMS_module,
     set_temperature_to_gcode,
+    get_jpeg_thumbnail,
+    get_mean_difference,
+    get_resized_jpeg,
 )
+from .bambu_cloud import TASK_CACHE_PRINT_START_MAX_AGE, TASK_CACHE_TTL
+from .cover_cache import COVER_VARIANTS, get_cover_digest, get_cover_url_key
 from .const import (
     LOGGER,
     Features,
@@ -42,6 +50,29 @@ from .commands import (
     SPEED_PROFILE_TEMPLATE,
 )
 
+_MISSING = object()
+
+class DirtyFieldTracker:
+    """Records which attributes change value during an update"""
+
+    def __setattr__(self, name, value):
+        # Tracking only starts once the first update has begun so initialization isn't recorded.
+        dirty_fields = self.__dict__.get("_dirty_fields")
+        if dirty_fields is not None and self.__dict__.get(name, _MISSING) != value:
+            dirty_fields.add(name)
+        object.__setattr__(self, name, value)
+
+    def reset_dirty_fields(self):
+        object.__setattr__(self, "_dirty_fields", set())
+
+    def mark_dirty(self, name: str):
+        self._dirty_fields.add(name)
+
+    @property
+    def dirty_fields(self) -> set:
+        return self.__dict__.get("_dirty_fields", set())
+
+
 class Device:
     def __init__(self, client):
         self._client = client
@@ -60,31 +91,94 @@ class Device:
         self.home_flag = HomeFlag(client=client)
         self.push_all_data = None
         self.get_version_data = None
+        self.changed_fields = set()
+        self._pending_changed_fields = set()
+        self._pending_changed_fields_lock = threading.Lock()
+        self._update_lock = threading.RLock()
+
+        # The order here is the order the sub-models are updated in.
+        self._print_update_models = (
+            ("info", self.info),
+            ("print_job", self.print_job),
+            ("temperature", self.temperature),
+            ("lights", self.lights),
+            ("fans", self.fans),
+            ("speed", self.speed),
+            ("stage", self.stage),
+            ("ams", self.ams),
+            ("external_spool", self.external_spool),
+            ("hms", self.hms),
+            ("print_error", self.print_error),
+            ("camera", self.camera),
+            ("home_flag", self.home_flag),
+        )
+        # Index of print report key -> names of the sub-models that consume it (their REPORT_KEYS).
+        self._report_key_index = {}
+        for name, model in self._print_update_models:
+            for key in model.REPORT_KEYS:
+                self._report_key_index.setdefault(key, set()).add(name)
+
         if self.supports_feature(Features.CAMERA_IMAGE):
             self.chamber_image = ChamberImage(client = client)
         self.cover_image = CoverImage(client = client)
 
     def print_update(self, data) -> bool:
-        send_event = False
-        send_event = send_event | self.info.print_update(data = data)
-        send_event = send_event | self.print_job.print_update(data = data)
-        send_event = send_event | self.temperature.print_update(data = data)
-        send_event = send_event | self.lights.print_update(data = data)
-        send_event = send_event | self.fans.print_update(data = data)
-        send_event = send_event | self.speed.print_update(data = data)
-        send_event = send_event | self.stage.print_update(data = data)
-        send_event = send_event | self.ams.print_update(data = data)
-        send_event = send_event | self.external_spool.print_update(data = data)
-        send_event = send_event | self.hms.print_update(data = data)
-        send_event = send_event | self.print_error.print_update(data = data)
-        send_event = send_event | self.camera.print_update(data = data)
-        send_event = send_event | self.home_flag.print_update(data = data)
-
-        if send_event and self._client.callback is not None:
+        # Cloud jobs merge task data into the print job from another thread so updates are serialized.
+        with self._update_lock:
+            # Delta reports often only contain a couple of keys so only update the sub-models that consume them.
+            routed = set()
+            for key in data:
+                routed.update(self._report_key_index.get(key, ()))
+            # Sub-models holding a local override have to see every message so the override can expire.
+            if self.fans.override_active:
+                routed.add("fans")
+            if self.lights.chamber_light_override != "":
+                routed.add("lights")
+
+            send_event = False
+            for name, model in self._print_update_models:
+                if name in routed:
+                    send_event = send_event | model.print_update(data = data)
+                else:
+                    model.reset_dirty_fields()
+            # Collected once every sub-model has run as some update fields of others, e.g. print_job sets info.usage_hours.
+            changed_fields = set()
+            for name, model in self._print_update_models:
+                if len(model.dirty_fields) != 0:
+                    # Record the sub-model name too so consumers can depend on a whole sub-model.
+                    changed_fields.add(name)
+                    changed_fields.update(f"{name}.{field}" for field in model.dirty_fields)
+            self.changed_fields = changed_fields
+
+            if send_event:
+                with self._pending_changed_fields_lock:
+                    self._pending_changed_fields.update(changed_fields)
+                if self._client.callback is not None:
+                    self._client.callback("event_printer_data_update")
+
+            if data.get("msg", 0) == 0:
+                self.push_all_data = data
+
+    @property
+    def update_lock(self) -> threading.RLock:
+        return self._update_lock
+
+    def record_changed_fields(self, name: str, fields):
+        """Record fields of a sub-model changed outside a print update, such as by a cloud job, and notify."""
+        if len(fields) == 0:
+            return
+        with self._pending_changed_fields_lock:
+            self._pending_changed_fields.add(name)
+            self._pending_changed_fields.update(f"{name}.{field}" for field in fields)
+        if self._client.callback is not None:
             self._client.callback("event_printer_data_update")
 
-        if data.get("msg", 0) == 0:
-            self.push_all_data = data
+    def pop_changed_fields(self) -> set:
+        """Return and clear the fields changed by print updates since the last call"""
+        with self._pending_changed_fields_lock:
+            changed_fields = self._pending_changed_fields
+            self._pending_changed_fields = set()
+        return changed_fields
 
     def info_update(self, data):
         self.info.info_update(data = data)
@@ -157,8 +251,10 @@ class Device:
             return self.external_spool
 
 @dataclass
-class Lights:
+class Lights(DirtyFieldTracker):
     """Return all light related info"""
+    REPORT_KEYS = ("lights_report",)
+
     chamber_light: str
     chamber_light_override: str
     work_light: str
@@ -170,7 +266,7 @@ class Lights:
         self.chamber_light_override = ""
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # "lights_report": [
         #     {
@@ -195,26 +291,30 @@ class Lights:
             search(data.get("lights_report", []), lambda x: x.get('node', "") == "work_light",
                    {"mode": self.work_light}).get("mode")
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     def TurnChamberLightOn(self):
-        self.chamber_light = "on"
-        self.chamber_light_override = "on"
+        with self._client._device.update_lock:
+            self.chamber_light = "on"
+            self.chamber_light_override = "on"
         if self._client.callback is not None:
             self._client.callback("event_light_update")
         self._client.publish(CHAMBER_LIGHT_ON)
 
     def TurnChamberLightOff(self):
-        self.chamber_light = "off"
-        self.chamber_light_override = "off"
+        with self._client._device.update_lock:
+            self.chamber_light = "off"
+            self.chamber_light_override = "off"
         if self._client.callback is not None:
             self._client.callback("event_light_update")
         self._client.publish(CHAMBER_LIGHT_OFF)
 
 
 @dataclass
-class Camera:
+class Camera(DirtyFieldTracker):
     """Return camera related info"""
+    REPORT_KEYS = ("ipcam",)
+
     recording: str
     resolution: str
     rtsp_url: str
@@ -228,7 +328,7 @@ class Camera:
         self.timelapse = ''
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # "ipcam": {
         #   "ipcam_dev": "1",
@@ -248,11 +348,13 @@ class Camera:
         else:
             self.rtsp_url = None
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
 @dataclass
-class Temperature:
+class Temperature(DirtyFieldTracker):
     """Return all temperature related info"""
+    REPORT_KEYS = ("bed_temper", "bed_target_temper", "chamber_temper", "nozzle_temper", "nozzle_target_temper")
+
     bed_temp: int
     target_bed_temp: int
     chamber_temp: int
@@ -268,7 +370,7 @@ class Temperature:
         self.target_nozzle_temp = 0
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         self.bed_temp = round(data.get("bed_temper", self.bed_temp))
         self.target_bed_temp = round(data.get("bed_target_temper", self.target_bed_temp))
@@ -276,7 +378,7 @@ class Temperature:
         self.nozzle_temp = round(data.get("nozzle_temper", self.nozzle_temp))
         self.target_nozzle_temp = round(data.get("nozzle_target_temper", self.target_nozzle_temp))
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     def set_target_temp(self, temp: TempEnum, temperature: int):
         command = set_temperature_to_gcode(temp, temperature)
@@ -289,13 +391,16 @@ class Temperature:
         LOGGER.debug(command)
         self._client.publish(command)
 
-        if self._client.callback is not None:
-            self._client.callback("event_printer_data_update")
+        # Nothing changes locally but have the target entity refresh against the last reported value.
+        self._client._device.record_changed_fields(
+            "temperature", ["target_bed_temp" if temp == TempEnum.HEATBED else "target_nozzle_temp"])
 
 
 @dataclass
-class Fans:
+class Fans(DirtyFieldTracker):
     """Return all fan related info"""
+    REPORT_KEYS = ("big_fan1_speed", "big_fan2_speed", "cooling_fan_speed", "heatbreak_fan_speed")
+
     _aux_fan_speed_percentage: int
     _aux_fan_speed: int
     _aux_fan_speed_override: int
@@ -329,7 +434,7 @@ class Fans:
         self._heatbreak_fan_speed = 0
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         self._aux_fan_speed = data.get("big_fan1_speed", self._aux_fan_speed)
         self._aux_fan_speed_percentage = fan_percentage(self._aux_fan_speed)
@@ -352,28 +457,33 @@ class Fans:
         self._heatbreak_fan_speed = data.get("heatbreak_fan_speed", self._heatbreak_fan_speed)
         self._heatbreak_fan_speed_percentage = fan_percentage(self._heatbreak_fan_speed)
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     def set_fan_speed(self, fan: FansEnum, percentage: int):
         """Set fan speed"""
         percentage = round(percentage / 10) * 10
         command = fan_percentage_to_gcode(fan, percentage)
 
-        if fan == FansEnum.PART_COOLING:
-            self._cooling_fan_speed = percentage
-            self._cooling_fan_speed_override_time = datetime.now()
-        elif fan == FansEnum.AUXILIARY:
-            self._aux_fan_speed_override = percentage
-            self._aux_fan_speed_override_time = datetime.now()
-        elif fan == FansEnum.CHAMBER:
-            self._chamber_fan_speed_override = percentage
-            self._chamber_fan_speed_override_time = datetime.now()
+        changed_fields = []
+        # Called from outside the message thread so don't write tracked fields mid print update.
+        with self._client._device.update_lock:
+            if fan == FansEnum.PART_COOLING:
+                self._cooling_fan_speed = percentage
+                self._cooling_fan_speed_override_time = datetime.now()
+                changed_fields = ["_cooling_fan_speed", "_cooling_fan_speed_override_time"]
+            elif fan == FansEnum.AUXILIARY:
+                self._aux_fan_speed_override = percentage
+                self._aux_fan_speed_override_time = datetime.now()
+                changed_fields = ["_aux_fan_speed_override", "_aux_fan_speed_override_time"]
+            elif fan == FansEnum.CHAMBER:
+                self._chamber_fan_speed_override = percentage
+                self._chamber_fan_speed_override_time = datetime.now()
+                changed_fields = ["_chamber_fan_speed_override", "_chamber_fan_speed_override_time"]
 
         LOGGER.debug(command)
         self._client.publish(command)
 
-        if self._client.callback is not None:
-            self._client.callback("event_printer_data_update")
+        self._client._device.record_changed_fields("fans", changed_fields)
 
     def get_fan_speed(self, fan: FansEnum) -> int:
         if fan == FansEnum.PART_COOLING:
@@ -394,9 +504,17 @@ class Fans:
         elif fan == FansEnum.HEATBREAK:
             return self._heatbreak_fan_speed_percentage
 
+    @property
+    def override_active(self) -> bool:
+        return self._aux_fan_speed_override_time is not None or \
+               self._chamber_fan_speed_override_time is not None or \
+               self._cooling_fan_speed_override_time is not None
+
 @dataclass
-class PrintJob:
+class PrintJob(DirtyFieldTracker):
     """Return all information related content"""
+    REPORT_KEYS = ("mc_percent", "gcode_state", "gcode_file", "print_type", "subtask_name", "layer_num", "total_layer_num",
+                   "gcode_start_time", "mc_remaining_time", "print_error")
 
     print_percentage: int
     gcode_state: str
@@ -451,9 +569,10 @@ class PrintJob:
         self.print_bed_type = "unknown"
         self.file_type_icon = "mdi:file"
         self.print_type = ""
+        self._task_data = None
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # Example payload:
         # {
@@ -499,7 +618,8 @@ class PrintJob:
         if previous_gcode_state == "unknown" and self.gcode_state != "unknown":
             self._update_task_data()
 
-        # Calculate start / end time after we update task data so we don't stomp on prepopulated values while idle on integration start.
+        # Task data is only requested here. It's merged later on the cloud job thread, so for a finished print the cloud
+        # start / end times replace the ones calculated below when idle on integration start.
         if data.get("gcode_start_time") is not None:
             if self.start_time != get_start_time(int(data.get("gcode_start_time"))):
                 LOGGER.debug(f"GCODE START TIME: {self.start_time}")
@@ -531,7 +651,7 @@ class PrintJob:
                 LOGGER.debug(f"GENERATED START TIME: {self.start_time}")
 
             # Update task data if bambu cloud connected
-            self._update_task_data()
+            self._update_task_data(TASK_CACHE_PRINT_START_MAX_AGE)
 
         # When a print is canceled by the user, this is the payload that's sent. A couple of seconds later
         # print_error will be reset to zero.
@@ -569,7 +689,7 @@ class PrintJob:
                 LOGGER.debug(f"NEW USAGE HOURS: {new_hours}")
                 self._client._device.info.usage_hours += new_hours
 
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     # The task list is of the following form with a 'hits' array with typical 20 entries.
     #
@@ -613,64 +733,100 @@ class PrintJob:
     #     "bedType": "textured_plate"
     #     },
 
-    def _update_task_data(self):
+    # Print job fields that can be filled in from the cloud task data.
+    TASK_DATA_FIELDS = ("_task_data", "print_weight", "_ams_print_weights", "_ams_print_lengths", "print_length",
+                        "print_bed_type", "start_time", "end_time")
+
+    def _update_task_data(self, max_age: float = TASK_CACHE_TTL):
+        # Fetched on the cloud job queue as the request would otherwise block this printer's message handling.
         if self._client.bambu_cloud.auth_token != "":
-            self._task_data = self._client.bambu_cloud.get_latest_task_for_printer(self._client._serial)
-            if self._task_data is None:
-                LOGGER.debug("No bambu cloud task data found for printer.")
-                self._client._device.cover_image.set_jpeg(None)
-                self.print_weight = 0
-                self._ams_print_weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-                self._ams_print_lengths = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-                self.print_length = 0
-                self.print_bed_type = "unknown"
-                self.start_time = None
-                self.end_time = None
-            else:
-                LOGGER.debug("Updating bambu cloud task data found for printer.")
-                url = self._task_data.get('cover', '')
-                if url != "":
-                    data = self._client.bambu_cloud.download(url)
-                    self._client._device.cover_image.set_jpeg(data)
-
-                self.print_length = self._task_data.get('length', self.print_length * 100) / 100
-                self.print_bed_type = self._task_data.get('bedType', self.print_bed_type)
-                self.print_weight = self._task_data.get('weight', self.print_weight)
-                ams_print_data = self._task_data.get('amsDetailMapping', [])
-                self._ams_print_weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-                self._ams_print_lengths = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-                if self.print_weight != 0:
-                    for ams_data in ams_print_data:
-                        index = ams_data['ams']
-                        weight = ams_data['weight']
-                        self._ams_print_weights[index] = weight
-                        self._ams_print_lengths[index] = self.print_length * weight / self.print_weight
-
-                status = self._task_data['status']
-                LOGGER.debug(f"CLOUD PRINT STATUS: {status}")
-                if self._client._device.supports_feature(Features.START_TIME_GENERATED) and (status == 4):
-                    # If we generate the start time (not X1), then rely more heavily on the cloud task data and
-                    # do so uniformly so we always have matched start/end times.
-
-                    # "startTime": "2023-12-21T19:02:16Z"
-                    cloud_time_str = self._task_data.get('startTime', "")
-                    LOGGER.debug(f"CLOUD START TIME1: {self.start_time}")
-                    if cloud_time_str != "":
-                        local_dt = parser.parse(cloud_time_str).astimezone(tz.tzlocal())
-                        # Convert it to timestamp and back to get rid of timezone in printed output to match datetime objects created from mqtt timestamps.
-                        local_dt = datetime.fromtimestamp(local_dt.timestamp())
-                        self.start_time = local_dt
-                        LOGGER.debug(f"CLOUD START TIME2: {self.start_time}")
-
-                    # "endTime": "2023-12-21T19:02:35Z"
-                    cloud_time_str = self._task_data.get('endTime', "")
-                    LOGGER.debug(f"CLOUD END TIME1: {self.end_time}")
-                    if cloud_time_str != "":
-                        local_dt = parser.parse(cloud_time_str).astimezone(tz.tzlocal())
-                        # Convert it to timestamp and back to get rid of timezone in printed output to match datetime objects created from mqtt timestamps.
-                        local_dt = datetime.fromtimestamp(local_dt.timestamp())
-                        self.end_time = local_dt
-                        LOGGER.debug(f"CLOUD END TIME2: {self.end_time}")
+            self._client.cloud_jobs.submit("task_data", functools.partial(self._fetch_task_data, max_age))
+
+    def _fetch_task_data(self, max_age, job):
+        task_data = self._client.bambu_cloud.get_latest_task_for_printer(self._client._serial, max_age)
+        if job.cancelled:
+            return
+
+        # Only the request runs unlocked. The merge writes fields print_update also writes, and its dirty fields.
+        with self._client._device.update_lock:
+            previous = {name: getattr(self, name) for name in self.TASK_DATA_FIELDS}
+            self._merge_task_data(task_data)
+            changed_fields = [name for name in self.TASK_DATA_FIELDS if getattr(self, name) != previous[name]]
+        self._client._device.record_changed_fields("print_job", changed_fields)
+
+    def _fetch_cover_image(self, url, task_id, job):
+        cache = self._client.cover_cache
+        keys = [f"task:{task_id}", get_cover_url_key(url)]
+        data = cache.get_image(*keys) if cache is not None else None
+        if data is None:
+            data = self._client.bambu_cloud.download(url)
+        if job.cancelled:
+            return
+        if data is not None and cache is not None:
+            cache.put_image([*keys, f"printer:{self._client._serial}"], data)
+        self._client._device.cover_image.set_jpeg(data)
+
+    def _merge_task_data(self, task_data):
+        self._task_data = task_data
+        if self._task_data is None:
+            LOGGER.debug("No bambu cloud task data found for printer.")
+            self._client.cloud_jobs.cancel("cover_image")
+            self._client._device.cover_image.set_jpeg(None)
+            self.print_weight = 0
+            self._ams_print_weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            self._ams_print_lengths = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            self.print_length = 0
+            self.print_bed_type = "unknown"
+            self.start_time = None
+            self.end_time = None
+        else:
+            LOGGER.debug("Updating bambu cloud task data found for printer.")
+            url = self._task_data.get('cover', '')
+            if url != "":
+                self._client.cloud_jobs.submit(
+                    "cover_image", functools.partial(self._fetch_cover_image, url, self._task_data.get('id')))
+
+            self.print_length = self._task_data.get('length', self.print_length * 100) / 100
+            self.print_bed_type = self._task_data.get('bedType', self.print_bed_type)
+            self.print_weight = self._task_data.get('weight', self.print_weight)
+            ams_print_data = self._task_data.get('amsDetailMapping', [])
+            # Build the lists locally and assign them whole so the change is recorded.
+            ams_print_weights = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            ams_print_lengths = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            if self.print_weight != 0:
+                for ams_data in ams_print_data:
+                    index = ams_data['ams']
+                    weight = ams_data['weight']
+                    ams_print_weights[index] = weight
+                    ams_print_lengths[index] = self.print_length * weight / self.print_weight
+            self._ams_print_weights = ams_print_weights
+            self._ams_print_lengths = ams_print_lengths
+
+            status = self._task_data['status']
+            LOGGER.debug(f"CLOUD PRINT STATUS: {status}")
+            if self._client._device.supports_feature(Features.START_TIME_GENERATED) and (status == 4):
+                # If we generate the start time (not X1), then rely more heavily on the cloud task data and
+                # do so uniformly so we always have matched start/end times.
+
+                # "startTime": "2023-12-21T19:02:16Z"
+                cloud_time_str = self._task_data.get('startTime', "")
+                LOGGER.debug(f"CLOUD START TIME1: {self.start_time}")
+                if cloud_time_str != "":
+                    local_dt = parser.parse(cloud_time_str).astimezone(tz.tzlocal())
+                    # Convert it to timestamp and back to get rid of timezone in printed output to match datetime objects created from mqtt timestamps.
+                    local_dt = datetime.fromtimestamp(local_dt.timestamp())
+                    self.start_time = local_dt
+                    LOGGER.debug(f"CLOUD START TIME2: {self.start_time}")
+
+                # "endTime": "2023-12-21T19:02:35Z"
+                cloud_time_str = self._task_data.get('endTime', "")
+                LOGGER.debug(f"CLOUD END TIME1: {self.end_time}")
+                if cloud_time_str != "":
+                    local_dt = parser.parse(cloud_time_str).astimezone(tz.tzlocal())
+                    # Convert it to timestamp and back to get rid of timezone in printed output to match datetime objects created from mqtt timestamps.
+                    local_dt = datetime.fromtimestamp(local_dt.timestamp())
+                    self.end_time = local_dt
+                    LOGGER.debug(f"CLOUD END TIME2: {self.end_time}")
 
     async def get_job_names(self) -> list[str]:
         """Get list of available print jobs from cache directory"""
@@ -697,8 +853,9 @@ class PrintJob:
 
 
 @dataclass
-class Info:
+class Info(DirtyFieldTracker):
     """Return all device related content"""
+    REPORT_KEYS = ("wifi_signal", "upgrade_state", "nozzle_diameter", "nozzle_type")
 
     # Device state
     serial: str
@@ -730,10 +887,11 @@ class Info:
         self.usage_hours = client._usage_hours
 
     def set_online(self, online):
-        if self.online != online:
+        with self._client._device.update_lock:
+            if self.online == online:
+                return
             self.online = online
-            if self._client.callback is not None:
-                self._client.callback("event_printer_data_update")
+        self._client._device.record_changed_fields("info", ["online"])
 
     def info_update(self, data):
 
@@ -766,7 +924,7 @@ class Info:
             self._client.callback("event_printer_info_update")
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # Example payload:
         # {
@@ -846,14 +1004,14 @@ class Info:
         self.nozzle_diameter = float(data.get("nozzle_diameter", self.nozzle_diameter))
         self.nozzle_type = data.get("nozzle_type", self.nozzle_type)
 
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     @property
     def has_bambu_cloud_connection(self) -> bool:
         return self._client.bambu_cloud.auth_token != ""
 
 @dataclass
-class AMSInstance:
+class AMSInstance(DirtyFieldTracker):
     """Return all AMS instance related info"""
     serial: str
     sw_version: str
@@ -876,8 +1034,10 @@ class AMSInstance:
 
 
 @dataclass
-class AMSList:
+class AMSList(DirtyFieldTracker):
     """Return all AMS related info"""
+    REPORT_KEYS = ("ams",)
+
     tray_now: int
     data: list[AMSInstance]
 
@@ -888,7 +1048,7 @@ class AMSList:
         self._first_initialization_done = False
 
     def info_update(self, data):
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # First determine if this the version info data or the json payload data. We use the version info to determine
         # what devices to add to humidity_index assistant and add all the sensors as entities. And then then json payload data
@@ -946,14 +1106,14 @@ class AMSList:
                 self._first_initialization_done = True
                 data_changed = True
 
-        data_changed = data_changed or (old_data != f"{self.__dict__}")
+        data_changed = data_changed or len(self.dirty_fields) != 0
 
         if data_changed:
             if self._client.callback is not None:
                 self._client.callback("event_ams_info_update")
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         # AMS json payload is of the form:
         # "ams": {
@@ -1023,22 +1183,27 @@ class AMSList:
                 # May get data before info so create entry if necessary
                 if self.data[index] is None:
                     self.data[index] = AMSInstance(self._client)
+                    self.mark_dirty("data")
 
-                if self.data[index].humidity_index != int(ams['humidity']):
-                    self.data[index].humidity_index = int(ams['humidity'])
-                if self.data[index].temperature != float(ams['temp']):
-                    self.data[index].temperature = float(ams['temp'])
+                # The AMS instances and trays are nested inside our data list so changes to them
+                # have to be rolled up explicitly.
+                self.data[index].reset_dirty_fields()
+                self.data[index].humidity_index = int(ams['humidity'])
+                self.data[index].temperature = float(ams['temp'])
+                if len(self.data[index].dirty_fields) != 0:
+                    self.mark_dirty("data")
 
                 tray_list = ams['tray']
                 for tray in tray_list:
                     tray_id = int(tray['id'])
-                    self.data[index].tray[tray_id].print_update(tray)
+                    if self.data[index].tray[tray_id].print_update(tray):
+                        self.mark_dirty("data")
 
-        data_changed = (old_data != f"{self.__dict__}")
+        data_changed = len(self.dirty_fields) != 0
         return data_changed
 
 @dataclass
-class AMSTray:
+class AMSTray(DirtyFieldTracker):
     """Return all AMS tray related info"""
     empty: bool
     idx: int
@@ -1070,7 +1235,7 @@ class AMSTray:
         self.tray_uuid = ""
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         if len(data) == 1:
             # If the data is exactly one entry then it's just the ID and the tray is empty.
@@ -1100,12 +1265,13 @@ class AMSTray:
             self.tray_uuid = data.get('tray_uuid', self.tray_uuid)
             self.k = data.get('k', self.k)
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
 
 @dataclass
 class ExternalSpool(AMSTray):
     """Return the virtual tray related info"""
+    REPORT_KEYS = ("vt_tray",)
 
     def __init__(self, client):
         super().__init__(client)
@@ -1141,6 +1307,7 @@ class ExternalSpool(AMSTray):
         # This is exact same data as the AMS exposes so we can just defer to the AMSTray object
         # to parse this json.
 
+        self.reset_dirty_fields()
         received_virtual_tray_data = False
         tray_data = data.get("vt_tray", {})
         if len(tray_data) != 0:
@@ -1150,8 +1317,10 @@ class ExternalSpool(AMSTray):
 
 
 @dataclass
-class Speed:
+class Speed(DirtyFieldTracker):
     """Return speed profile information"""
+    REPORT_KEYS = ("spd_lvl", "spd_mag")
+
     _id: int
     name: str
     modifier: int
@@ -1163,19 +1332,20 @@ class Speed:
         self.modifier = 100
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         self._id = int(data.get("spd_lvl", self._id))
         self.name = get_speed_name(self._id)
         self.modifier = int(data.get("spd_mag", self.modifier))
         
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     def SetSpeed(self, option: str):
         for id, speed in SPEED_PROFILE.items():
             if option == speed:
-                self._id = id
-                self.name = speed
+                with self._client._device.update_lock:
+                    self._id = id
+                    self.name = speed
                 command = SPEED_PROFILE_TEMPLATE
                 command['print']['param'] = f"{id}"
                 self._client.publish(command)
@@ -1184,8 +1354,10 @@ class Speed:
 
 
 @dataclass
-class StageAction:
+class StageAction(DirtyFieldTracker):
     """Return Stage Action information"""
+    REPORT_KEYS = ("print_type", "stg_cur")
+
     _id: int
     _print_type: str
     description: str
@@ -1196,7 +1368,7 @@ class StageAction:
         self.description = get_current_stage(self._id)
 
     def print_update(self, data) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
 
         self._print_type = data.get("print_type", self._print_type)
         if self._print_type.lower() not in PRINT_TYPE_OPTIONS:
@@ -1207,11 +1379,13 @@ class StageAction:
             self._id = 255
         self.description = get_current_stage(self._id)
 
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
 @dataclass
-class HMSList:
+class HMSList(DirtyFieldTracker):
     """Return all HMS related info"""
+    REPORT_KEYS = ("hms",)
+
     _count: int
     _errors: dict
 
@@ -1233,6 +1407,7 @@ class HMSList:
         # https://wiki.bambulab.com/en/x1/troubleshooting/hmscode/0300_0100_0001_0007
         # 'The heatbed temperature is abnormal; the sensor may have an open circuit.'
 
+        self.reset_dirty_fields()
         if 'hms' in data.keys():
             hmsList = data.get('hms', [])
             self._count = len(hmsList)
@@ -1272,8 +1447,10 @@ class HMSList:
         return self._count
 
 @dataclass
-class PrintErrorList:
+class PrintErrorList(DirtyFieldTracker):
     """Return all print_error related info"""
+    REPORT_KEYS = ("print_error",)
+
     _error: dict
     _count: int
 
@@ -1289,6 +1466,7 @@ class PrintErrorList:
         # https://e.bambulab.com/query.php?lang=en
         # 'Unable to feed filament into the extruder. This could be due to entangled filament or a stuck spool. If not, please check if the AMS PTFE tube is connected.'
 
+        self.reset_dirty_fields()
         if 'print_error' in data.keys():
             errors = None
             print_error_code = data.get('print_error')
@@ -1348,25 +1526,77 @@ class HMSNotification:
         return ""
 
 
+@dataclass(frozen=True)
+class ChamberImageFrame:
+    """A single jpeg frame from the chamber camera"""
+    jpeg: bytes
+    timestamp: datetime
+    version: int = 0
+    etag: str = ""
+
+
 @dataclass
 class ChamberImage:
     """Returns the latest jpeg data from the P1P camera"""
+    FINGERPRINT_SIZE = (32, 24)
+
     def __init__(self, client):
         self._client = client
-        self._bytes = bytearray()
-        self._image_last_updated = datetime.now()
-
-    def set_jpeg(self, bytes):
-        self._bytes = bytes
-        self._image_last_updated = datetime.now()
-        if self._client.callback is not None:
+        self._frame = ChamberImageFrame(b"", datetime.now())
+        self._frame_condition = threading.Condition()
+        self._fingerprint = None
+        self._received_count = 0
+
+    def set_jpeg(self, jpeg: bytes, etag: str = None, timestamp: datetime = None):
+        # Frames are replaced rather than modified so readers can share them without copying.
+        # The version only ever increases and the etag identifies the content for conditional requests.
+        # The camera worker supplies the etag and receive time it already computed.
+        if etag is None:
+            etag = hashlib.blake2b(jpeg, digest_size=16).hexdigest()
+        if timestamp is None:
+            timestamp = datetime.now()
+        unchanged = etag == self._frame.etag
+
+        # Optionally also drop frames that only differ from the last published one by sensor noise.
+        fingerprint = None
+        threshold = self._client._camera_change_threshold
+        if not unchanged and threshold > 0:
+            try:
+                fingerprint = get_jpeg_thumbnail(jpeg, self.FINGERPRINT_SIZE)
+            except Exception as e:
+                LOGGER.debug(f"Unable to fingerprint chamber image: {e}")
+            if fingerprint is not None and self._fingerprint is not None:
+                unchanged = get_mean_difference(fingerprint, self._fingerprint) < threshold
+
+        with self._frame_condition:
+            self._received_count += 1
+            if not unchanged:
+                self._frame = ChamberImageFrame(jpeg, timestamp, self._frame.version + 1, etag)
+                self._fingerprint = fingerprint
+            self._frame_condition.notify_all()
+
+        if not unchanged and self._client.callback is not None:
             self._client.callback("event_printer_chamber_image_update")
 
-    def get_jpeg(self) -> bytearray:
-        return self._bytes.copy()
+    @property
+    def received_count(self) -> int:
+        """Number of frames received from the printer, including ones dropped as unchanged."""
+        return self._received_count
+
+    def get_frame(self) -> ChamberImageFrame:
+        return self._frame
+
+    def wait_for_frame(self, min_received_count: int, timeout: float) -> ChamberImageFrame:
+        """Block until min_received_count frames have been received or the timeout passes, returning the latest frame."""
+        with self._frame_condition:
+            self._frame_condition.wait_for(lambda: self._received_count >= min_received_count, timeout)
+            return self._frame
+
+    def get_jpeg(self) -> bytes:
+        return self._frame.jpeg
     
     def get_last_update_time(self) -> datetime:
-        return self._image_last_updated
+        return self._frame.timestamp
     
     @property
     def available(self):
@@ -1379,24 +1609,84 @@ class CoverImage:
     def __init__(self, client):
         self._client = client
         self._bytes = bytearray()
+        self._digest = None
+        self._variants = {}
+        self._lock = threading.Lock()
+        self._variant_lock = threading.Lock()
         self._image_last_updated = datetime.now()
         if self._client.callback is not None:
             self._client.callback("event_printer_cover_image_update")
 
     def set_jpeg(self, bytes):
-        self._bytes = bytes
+        with self._lock:
+            self._bytes = bytes
+            self._digest = get_cover_digest(bytes) if bytes else None
+            self._variants = {}
         self._image_last_updated = datetime.now()
+        if self._client.callback is not None:
+            self._client.callback("event_printer_cover_image_update")
+
+    def load_cached(self):
+        """Show the printer's last cover from the disk cache until the cloud task data arrives."""
+        cache = self._client.cover_cache
+        if cache is None:
+            return
+
+        def load(job):
+            data = cache.get_image(f"printer:{self._client._serial}")
+            if data is not None and not job.cancelled:
+                LOGGER.debug("Loaded cover image from the cache")
+                self.set_jpeg(data)
+
+        self._client.cloud_jobs.submit("cover_image", load)
     
     def get_jpeg(self) -> bytearray:
         return self._bytes
 
+    def get_variant(self, variant: str) -> bytes | None:
+        """Return the cover downscaled to one of COVER_VARIANTS as a jpeg. Blocks to generate it the first time."""
+        with self._variant_lock:
+            with self._lock:
+                data = self._bytes
+                digest = self._digest
+                jpeg = self._variants.get(variant)
+            if jpeg is not None or not data:
+                return jpeg
+
+            cache = self._client.cover_cache
+            if cache is not None:
+                jpeg = cache.get_variant(digest, variant)
+            if jpeg is None:
+                try:
+                    jpeg = get_resized_jpeg(data, COVER_VARIANTS[variant])
+                except (OSError, SyntaxError, ValueError) as e:
+                    # Truncated or unsupported download. Serve it as is like before variants existed.
+                    LOGGER.debug(f"Unable to generate the {variant} cover image variant: {e}")
+                    jpeg = data
+                if jpeg is None:
+                    # PIL isn't available so the original is all there is.
+                    return data
+                if cache is not None and jpeg is not data:
+                    cache.put_variant(digest, variant, jpeg)
+
+            with self._lock:
+                # Don't keep it if the cover changed while it was being generated.
+                if self._digest == digest:
+                    self._variants[variant] = jpeg
+            return jpeg
+
+    def get_digest(self) -> str | None:
+        return self._digest
+
     def get_last_update_time(self) -> datetime:
         return self._image_last_updated
 
 
 @dataclass
-class HomeFlag:
+class HomeFlag(DirtyFieldTracker):
     """Contains parsed _values from the homeflag sensor"""
+    REPORT_KEYS = ("home_flag",)
+
     _value: int
     _sw_ver: str
     _device_type: str 
@@ -1413,9 +1703,9 @@ class HomeFlag:
         self._sw_ver = get_sw_version(modules, self._sw_ver)
 
     def print_update(self, data: dict) -> bool:
-        old_data = f"{self.__dict__}"
+        self.reset_dirty_fields()
         self._value = int(data.get("home_flag", str(self._value)))
-        return (old_data != f"{self.__dict__}")
+        return len(self.dirty_fields) != 0
 
     @property
     def door_open(self) -> bool or None:
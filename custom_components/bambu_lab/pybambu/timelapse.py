@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import os
+import re
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+
+from collections import deque
+from datetime import datetime
+
+from .const import LOGGER
+
+
+# "layer" captures a frame on each layer change. "interval" captures one every TIMELAPSE_INTERVAL seconds.
+TIMELAPSE_CAPTURES = ("layer", "interval")
+TIMELAPSE_CAPTURE = "layer"
+TIMELAPSE_INTERVAL = 30
+TIMELAPSE_MEMORY_LIMIT = 32 * 1024 * 1024
+TIMELAPSE_FPS = 30
+# How long ffmpeg may take to finish encoding once every frame has been written to it.
+TIMELAPSE_ASSEMBLE_TIMEOUT = 600
+# Amount of ffmpeg's error output included in the log when assembly fails.
+TIMELAPSE_ERROR_LOG_SIZE = 4096
+
+IDLE_GCODE_STATES = ["IDLE", "FAILED", "FINISH", "unknown"]
+
+
+class TimelapseRecorder:
+    """Captures chamber frames during a print and assembles them into a local timelapse video.
+
+    Captured frames are held in memory up to a size limit. Beyond that the oldest frames are appended
+    to a segment file next to the output, so a long print never has to be held in RAM. At the end of
+    the print the segment file and then the in-memory frames are streamed through ffmpeg.
+    """
+
+    # Each frame in the segment file is stored as a little endian 4 byte length followed by the jpeg.
+    _RECORD_HEADER = struct.Struct("<I")
+
+    def __init__(self, client, config):
+        self._client = client
+        self._directory = config.get('timelapse_directory', '')
+        self._ffmpeg_binary = config.get('ffmpeg_binary', 'ffmpeg')
+        self._capture = config.get('timelapse_capture', TIMELAPSE_CAPTURE)
+        self._interval = config.get('timelapse_interval', TIMELAPSE_INTERVAL)
+        self._memory_limit = config.get('timelapse_memory_limit', TIMELAPSE_MEMORY_LIMIT)
+        self._fps = config.get('timelapse_fps', TIMELAPSE_FPS)
+
+        self._lock = threading.Lock()
+        self._recording = False
+        self._output_path = None
+        self._segment = None
+        self._frames = deque()
+        self._frames_size = 0
+        self._frame_count = 0
+        self._last_layer = None
+        self._last_capture = None
+
+    @property
+    def recording(self) -> bool:
+        return self._recording
+
+    def update(self):
+        """Start or finish a recording as the print job state changes. Called after each print update."""
+        print_job = self._client.get_device().print_job
+        active = print_job.gcode_state not in IDLE_GCODE_STATES
+        if active and not self._recording:
+            self._start(print_job.subtask_name)
+        elif not active and self._recording:
+            self._finish()
+
+    def add_frame(self, jpeg: bytes):
+        """Offer a received chamber frame, capturing it if it's due. Called on the camera thread."""
+        if not self._recording:
+            return
+        print_job = self._client.get_device().print_job
+        with self._lock:
+            if not self._recording:
+                return
+            if self._capture == "layer":
+                layer = print_job.current_layer
+                if print_job.gcode_state != "RUNNING" or layer == 0 or layer == self._last_layer:
+                    return
+                self._last_layer = layer
+            else:
+                now = time.monotonic()
+                if self._last_capture is not None and now - self._last_capture < self._interval:
+                    return
+                self._last_capture = now
+            self._append(jpeg)
+
+    def _start(self, name: str):
+        directory = os.path.join(self._directory, self._client._serial)
+        os.makedirs(directory, exist_ok=True)
+        stem = datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = re.sub(r"[^\w\-]+", "_", name).strip("_")
+        if name != "":
+            stem = f"{stem}_{name}"
+
+        with self._lock:
+            self._output_path = os.path.join(directory, f"{stem}.mp4")
+            self._segment = None
+            self._frames = deque()
+            self._frames_size = 0
+            self._frame_count = 0
+            self._last_layer = None
+            self._last_capture = None
+            self._recording = True
+        LOGGER.debug(f"Timelapse recording started: {self._output_path}")
+
+        # Make sure the camera stays connected for the whole print.
+        self._client.subscribe_camera()
+
+    def _finish(self):
+        with self._lock:
+            self._recording = False
+            output_path = self._output_path
+            frames = self._frames
+            frame_count = self._frame_count
+            segment_path = None
+            if self._segment is not None:
+                segment_path = self._segment.name
+                self._segment.close()
+            self._segment = None
+            self._frames = deque()
+            self._frames_size = 0
+
+        self._client.unsubscribe_camera()
+
+        if frame_count < 2:
+            LOGGER.debug("Timelapse recording ended without enough frames.")
+            if segment_path is not None:
+                os.remove(segment_path)
+            return
+
+        LOGGER.debug(f"Timelapse recording ended with {frame_count} frames. Assembling {output_path}")
+        thread = threading.Thread(target=self._assemble, args=(output_path, segment_path, frames), daemon=True)
+        thread.name = f"{self._client._device.info.device_type}-Timelapse-{threading.get_native_id()}"
+        thread.start()
+
+    def _append(self, jpeg: bytes):
+        self._frames.append(jpeg)
+        self._frames_size += len(jpeg)
+        self._frame_count += 1
+        while self._frames_size > self._memory_limit and len(self._frames) > 1:
+            oldest = self._frames.popleft()
+            self._frames_size -= len(oldest)
+            if self._segment is None:
+                self._segment = open(f"{self._output_path}.frames", "ab")
+            self._segment.write(self._RECORD_HEADER.pack(len(oldest)))
+            self._segment.write(oldest)
+
+    def _read_segment(self, segment_path: str):
+        with open(segment_path, "rb") as segment:
+            while True:
+                header = segment.read(self._RECORD_HEADER.size)
+                if len(header) < self._RECORD_HEADER.size:
+                    return
+                (size,) = self._RECORD_HEADER.unpack(header)
+                jpeg = segment.read(size)
+                if len(jpeg) < size:
+                    LOGGER.error(f"Truncated timelapse segment file: {segment_path}")
+                    return
+                yield jpeg
+
+    def _assemble(self, output_path: str, segment_path: str | None, frames: deque):
+        command = [
+            self._ffmpeg_binary, "-y", "-loglevel", "error",
+            "-f", "image2pipe", "-framerate", str(self._fps), "-c:v", "mjpeg", "-i", "-",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", output_path,
+        ]
+        try:
+            # ffmpeg's error output goes to a file as a pipe nobody reads until the end would block it once full.
+            with tempfile.TemporaryFile() as stderr:
+                process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+                try:
+                    # Stream frames into ffmpeg one at a time, the spilled ones first as they're the oldest.
+                    if segment_path is not None:
+                        for jpeg in self._read_segment(segment_path):
+                            process.stdin.write(jpeg)
+                    for jpeg in frames:
+                        process.stdin.write(jpeg)
+                except BrokenPipeError:
+                    # ffmpeg exited early. Its error output is logged below.
+                    pass
+                finally:
+                    try:
+                        process.stdin.close()
+                    except BrokenPipeError:
+                        pass
+
+                try:
+                    process.wait(TIMELAPSE_ASSEMBLE_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                    LOGGER.error(f"Timelapse assembly timed out after {TIMELAPSE_ASSEMBLE_TIMEOUT}s")
+                    return
+                if process.returncode != 0:
+                    stderr.seek(max(stderr.seek(0, os.SEEK_END) - TIMELAPSE_ERROR_LOG_SIZE, 0))
+                    LOGGER.error(f"Timelapse assembly failed: {stderr.read().decode(errors='replace').strip()}")
+                else:
+                    LOGGER.info(f"Timelapse saved to {output_path}")
+        except Exception as e:
+            LOGGER.error("An exception occurred assembling the timelapse:", exc_info=e)
+        finally:
+            if segment_path is not None and os.path.exists(segment_path):
+                os.remove(segment_path)
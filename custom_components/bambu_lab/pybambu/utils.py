@@ -1,3 +1,4 @@
+import io
 import math
 from datetime import datetime, timedelta
 
@@ -17,6 +18,13 @@ from .const import (
 )
 from .commands import SEND_GCODE_TEMPLATE
 
+pil_available = False
+try:
+    from PIL import Image
+    pil_available = True
+except ImportError:
+    pil_available = False
+
 
 def search(lst, predicate, default={}):
     """Search an array for a string"""
@@ -246,3 +254,53 @@ def get_Url(url: str, region: str):
     if region == "China":
         urlstr = urlstr.replace('.com', '.cn')
     return urlstr
+
+
+def get_jpeg_thumbnail(jpeg: bytes, size: tuple[int, int], oversample: int = 2) -> bytes | None:
+    """Return the jpeg as raw 8-bit grayscale pixels of the given size, or None if PIL is unavailable."""
+    if not pil_available:
+        return None
+    image = Image.open(io.BytesIO(jpeg))
+    # Have the jpeg decoder downscale while decoding instead of decoding the full frame.
+    image.draft("L", (size[0] * oversample, size[1] * oversample))
+    return image.convert("L").resize(size).tobytes()
+
+
+def get_jpeg_draft(jpeg: bytes, size: tuple[int, int]) -> tuple[bytes, tuple[int, int]] | None:
+    """Return the jpeg as raw 8-bit grayscale pixels and their size, or None if PIL is unavailable.
+
+    The image is left at the smallest scale the jpeg decoder can produce that's at least size (as small as
+    1/8 of the original) rather than resized to it exactly, as the decode is all that's needed.
+    """
+    if not pil_available:
+        return None
+    image = Image.open(io.BytesIO(jpeg))
+    image.draft("L", size)
+    if image.mode != "L":
+        image = image.convert("L")
+    return image.tobytes(), image.size
+
+
+def get_resized_jpeg(data: bytes, size: tuple[int, int], quality: int = 85) -> bytes | None:
+    """Return the image (jpeg or png) as a jpeg no larger than size, or None if PIL is unavailable."""
+    if not pil_available:
+        return None
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", size)
+    image.thumbnail(size)
+    if image.mode in ("RGBA", "LA", "P"):
+        # Jpeg has no transparency so flatten onto white as the slicer previews expect.
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def get_mean_difference(a: bytes, b: bytes) -> float:
+    """Mean absolute difference between two equal length grayscale thumbnails."""
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
@@ -0,0 +1,320 @@
+"""Shares a single RTSP session to an X1 camera between stills and HA stream consumers."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import secrets
+import time
+
+from collections import deque
+from datetime import datetime
+
+from aiohttp import web
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+
+from .const import DOMAIN, LOGGER
+from .pybambu.models import ChamberImageFrame
+
+RTSP_BROKER_IDLE_TIMEOUT = 60
+RTSP_FIRST_KEYFRAME_TIMEOUT = 10
+RTSP_RESTART_DELAY = 5
+# Number of pending stream chunks a relay client may fall behind before it's disconnected.
+RELAY_CLIENT_QUEUE_SIZE = 256
+RELAY_CHUNK_SIZE = 64 * 1024
+
+JPEG_END = b"\xff\xd9"
+
+STREAM_RELAY = f"{DOMAIN}_stream_relay"
+
+
+class StreamRelay:
+    """Loopback HTTP server that fans each broker's MPEG-TS stream out to its consumers.
+
+    HA's stream worker opens the relay URL instead of the printer's RTSP URL. Each broker is reachable
+    under a random token so other local processes can't guess the path.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._brokers: dict[str, RtspBroker] = {}
+        self._runner: web.AppRunner | None = None
+        self._port = 0
+        self._started: asyncio.Task | None = None
+
+    @classmethod
+    async def async_get(cls, hass: HomeAssistant) -> StreamRelay:
+        relay = hass.data.get(STREAM_RELAY)
+        if relay is None:
+            relay = hass.data[STREAM_RELAY] = StreamRelay(hass)
+            relay._started = hass.async_create_task(relay._async_start())
+        await relay._started
+        return relay
+
+    async def _async_start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{token}", self._handle)
+        self._runner = web.AppRunner(app, handle_signals=False)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self._port = self._runner.addresses[0][1]
+        LOGGER.debug(f"Stream relay listening on port {self._port}")
+        self._hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_stop)
+
+    async def _async_stop(self, event: Event) -> None:
+        self._hass.data.pop(STREAM_RELAY, None)
+        await self._runner.cleanup()
+
+    def register(self, broker: RtspBroker) -> str:
+        token = secrets.token_urlsafe(16)
+        self._brokers[token] = broker
+        return f"http://127.0.0.1:{self._port}/{token}"
+
+    def unregister(self, broker: RtspBroker) -> None:
+        for token in [token for token, value in self._brokers.items() if value is broker]:
+            del self._brokers[token]
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        broker = self._brokers.get(request.match_info["token"])
+        if broker is None:
+            return web.Response(status=404)
+
+        return await broker.async_stream_mpegts(request)
+
+
+class RtspBroker:
+    """Keeps one RTSP session per printer running while anything is consuming it.
+
+    A single ffmpeg process copies the video into an MPEG-TS stream for the relay and decodes only the
+    keyframes into JPEG stills, so the printer sees one session however many stills and streams are in
+    use. Once nothing has asked for a still or held a stream for the idle timeout, the session is closed.
+    Only used from the HA event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, ffmpeg_binary: str) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._ffmpeg_binary = ffmpeg_binary
+        self._queues: set[asyncio.Queue] = set()
+        self._frame: ChamberImageFrame | None = None
+        self._frame_version = 0
+        self._image_received = asyncio.Event()
+        self._holders = 0
+        self._last_used = 0.0
+        self._task: asyncio.Task | None = None
+        self._relay: StreamRelay | None = None
+        self._stream_url: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def frame(self) -> ChamberImageFrame | None:
+        return self._frame
+
+    async def async_get_frame(self) -> ChamberImageFrame | None:
+        """Return the latest keyframe, starting the session and waiting for the first one if needed."""
+        self._touch()
+        if self._frame is None:
+            try:
+                await asyncio.wait_for(self._image_received.wait(), RTSP_FIRST_KEYFRAME_TIMEOUT)
+            except asyncio.TimeoutError:
+                LOGGER.debug("Timed out waiting for the first RTSP keyframe")
+        return self._frame
+
+    async def async_get_image(self) -> bytes | None:
+        frame = await self.async_get_frame()
+        return None if frame is None else frame.jpeg
+
+    def hold(self) -> None:
+        """Keep the session running for a consumer of the keyframes, which arrive via the chamber image broadcaster."""
+        self._holders += 1
+        self._touch()
+
+    def release(self) -> None:
+        self._holders -= 1
+        self._last_used = time.monotonic()
+
+    async def async_get_stream_url(self) -> str:
+        if self._stream_url is None:
+            self._relay = await StreamRelay.async_get(self._hass)
+            self._stream_url = self._relay.register(self)
+        return self._stream_url
+
+    async def async_stream_mpegts(self, request: web.Request) -> web.StreamResponse:
+        """Stream the shared session to a client. The same chunks are written to every client."""
+        response = web.StreamResponse()
+        response.content_type = "video/mp2t"
+        await response.prepare(request)
+
+        queue = self.subscribe()
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        except ConnectionResetError:
+            LOGGER.debug("MPEG-TS stream client disconnected")
+        finally:
+            self.unsubscribe(queue)
+        return response
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=RELAY_CLIENT_QUEUE_SIZE)
+        self._queues.add(queue)
+        self._touch()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._queues.discard(queue)
+        self._last_used = time.monotonic()
+
+    def stop(self) -> None:
+        if self._relay is not None:
+            self._relay.unregister(self)
+            self._relay = None
+            self._stream_url = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _touch(self) -> None:
+        self._last_used = time.monotonic()
+        if self._task is None:
+            self._task = self._hass.async_create_background_task(self._run(), f"{DOMAIN} rtsp broker")
+
+    def _idle(self) -> bool:
+        return len(self._queues) == 0 and self._holders == 0 and time.monotonic() - self._last_used > RTSP_BROKER_IDLE_TIMEOUT
+
+    def _publish(self, chunk: bytes) -> None:
+        for queue in list(self._queues):
+            if queue.full():
+                # The client has fallen too far behind. Drop it rather than buffer without limit.
+                LOGGER.debug("Stream relay client fell behind, disconnecting it")
+                self._queues.discard(queue)
+                self._disconnect(queue)
+            else:
+                queue.put_nowait(chunk)
+
+    @staticmethod
+    def _disconnect(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _run(self) -> None:
+        try:
+            while not self._idle():
+                url = self._coordinator.get_rtsp_url()
+                if url is None:
+                    LOGGER.debug("No RTSP URL available for the broker")
+                else:
+                    await self._run_ffmpeg(url)
+                if self._idle():
+                    break
+                await asyncio.sleep(RTSP_RESTART_DELAY)
+        finally:
+            LOGGER.debug("RTSP broker stopped")
+            self._frame = None
+            self._image_received = asyncio.Event()
+            for queue in self._queues:
+                self._disconnect(queue)
+            self._queues.clear()
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def _run_ffmpeg(self, url: str) -> None:
+        # Stills come out on stdout. The stream copy goes to a second pipe so neither blocks on the other.
+        stream_read, stream_write = os.pipe()
+        command = [
+            self._ffmpeg_binary, "-hide_banner", "-loglevel", "error",
+            "-rtsp_transport", "tcp", "-skip_frame", "nokey", "-i", url,
+            "-map", "0:v", "-c:v", "copy", "-f", "mpegts", f"pipe:{stream_write}",
+            "-map", "0:v", "-fps_mode", "passthrough", "-c:v", "mjpeg", "-q:v", "4", "-f", "image2pipe", "pipe:1",
+        ]
+        LOGGER.debug("Starting RTSP broker session")
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                pass_fds=(stream_write,),
+            )
+        except OSError as e:
+            LOGGER.error(f"Unable to start ffmpeg for the RTSP broker: {e}")
+            os.close(stream_read)
+            return
+        finally:
+            os.close(stream_write)
+
+        loop = asyncio.get_running_loop()
+        stream = asyncio.StreamReader(limit=RELAY_CHUNK_SIZE)
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(stream), os.fdopen(stream_read, "rb", 0))
+        errors = deque(maxlen=10)
+        pumps = [
+            asyncio.create_task(self._pump_images(process.stdout)),
+            asyncio.create_task(self._pump_stream(stream)),
+            asyncio.create_task(self._pump_errors(process.stderr, errors)),
+            asyncio.create_task(self._watch_idle()),
+        ]
+        try:
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            transport.close()
+            if process.returncode is None:
+                process.kill()
+            await asyncio.shield(process.wait())
+        if errors:
+            LOGGER.debug(f"RTSP broker ffmpeg exited: {' '.join(errors)}")
+
+    async def _pump_images(self, reader: asyncio.StreamReader) -> None:
+        buffer = bytearray()
+        while True:
+            chunk = await reader.read(RELAY_CHUNK_SIZE)
+            if not chunk:
+                return
+            # Only search the newly arrived bytes, plus one in case the end marker straddles the boundary.
+            start = max(len(buffer) - 1, 0)
+            buffer += chunk
+            while (end := buffer.find(JPEG_END, start)) != -1:
+                self._on_image(bytes(buffer[:end + len(JPEG_END)]))
+                del buffer[:end + len(JPEG_END)]
+                start = 0
+
+    def _on_image(self, jpeg: bytes) -> None:
+        self._frame_version += 1
+        self._frame = ChamberImageFrame(
+            jpeg=jpeg,
+            timestamp=datetime.now(),
+            version=self._frame_version,
+            etag=hashlib.blake2b(jpeg, digest_size=16).hexdigest())
+        self._image_received.set()
+        broadcaster = self._coordinator.chamber_image_broadcaster
+        if broadcaster.has_subscribers:
+            broadcaster.publish(self._frame)
+
+    async def _pump_stream(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            chunk = await reader.read(RELAY_CHUNK_SIZE)
+            if not chunk:
+                return
+            self._publish(chunk)
+
+    async def _pump_errors(self, reader: asyncio.StreamReader, errors: deque) -> None:
+        while line := await reader.readline():
+            errors.append(line.decode(errors="replace").strip())
+        # Keep running until the other pumps see the end of the output.
+        await asyncio.Event().wait()
+
+    async def _watch_idle(self) -> None:
+        while not self._idle():
+            await asyncio.sleep(RTSP_BROKER_IDLE_TIMEOUT / 4)
@@ -0,0 +1,196 @@
+"""HTTP views for the Bambu Lab integration."""
+from __future__ import annotations
+
+from http import HTTPStatus
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, LOGGER
+from .coordinator import BambuDataUpdateCoordinator
+from .pybambu.const import Features
+from .pybambu.cover_cache import COVER_VARIANTS
+from .rtsp_broker import RtspBroker
+
+VIEWS_REGISTERED = f"{DOMAIN}_views_registered"
+
+
+def async_register_views(hass: HomeAssistant) -> None:
+    """Register the integration's views once for all config entries."""
+    if hass.data.get(VIEWS_REGISTERED, False):
+        return
+    hass.data[VIEWS_REGISTERED] = True
+    LOGGER.debug("Registering Bambu Lab views")
+    hass.http.register_view(ChamberImageView(hass))
+    hass.http.register_view(CameraStreamView(hass))
+    hass.http.register_view(CoverImageView(hass))
+
+
+def get_coordinator_for_serial(hass: HomeAssistant, serial: str) -> BambuDataUpdateCoordinator | None:
+    for coordinator in hass.data.get(DOMAIN, {}).values():
+        if coordinator.get_model().info.serial == serial:
+            return coordinator
+    return None
+
+
+def get_rtsp_broker(coordinator: BambuDataUpdateCoordinator) -> RtspBroker | None:
+    """Returns the broker if this is an X1 printer sharing its RTSP session."""
+    if coordinator.get_model().supports_feature(Features.CAMERA_RTSP):
+        return coordinator.rtsp_broker
+    return None
+
+
+async def async_stream_mjpeg(hass: HomeAssistant, coordinator: BambuDataUpdateCoordinator, request: web.Request) -> web.StreamResponse:
+    """Stream camera frames as MJPEG from the printer's single connection as they arrive.
+
+    Every client is written the same frame bytes. A client that can't keep up only ever has the newest frame
+    waiting for it, so it skips frames instead of holding the others back.
+    """
+    broker = get_rtsp_broker(coordinator)
+    if broker is None and not coordinator.get_model().supports_feature(Features.CAMERA_IMAGE):
+        return web.Response(status=HTTPStatus.NOT_FOUND)
+    client = coordinator.client
+    broadcaster = coordinator.chamber_image_broadcaster
+
+    response = web.StreamResponse()
+    response.content_type = "multipart/x-mixed-replace;boundary=--frameboundary"
+    await response.prepare(request)
+
+    queue = broadcaster.subscribe()
+    if broker is None:
+        await hass.async_add_executor_job(client.subscribe_camera)
+        frame = coordinator.get_model().chamber_image.get_frame()
+    else:
+        broker.hold()
+        frame = broker.frame
+    try:
+        while True:
+            if frame is not None and frame.version != 0:
+                await response.write(
+                    f"--frameboundary\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame.jpeg)}\r\n\r\n".encode())
+                await response.write(frame.jpeg)
+                await response.write(b"\r\n")
+            frame = await queue.get()
+    except ConnectionResetError:
+        LOGGER.debug("Camera stream client disconnected")
+    finally:
+        broadcaster.unsubscribe(queue)
+        if broker is None:
+            # Not awaited as the handler may be being cancelled.
+            hass.async_add_executor_job(client.unsubscribe_camera)
+        else:
+            broker.release()
+
+    return response
+
+
+class ChamberImageView(HomeAssistantView):
+    """Serves the latest chamber image, answering conditional requests without resending the frame."""
+
+    url = "/api/bambu_lab/chamber_image/{serial}"
+    name = "api:bambu_lab:chamber_image"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+
+    async def get(self, request: web.Request, serial: str) -> web.StreamResponse:
+        coordinator = get_coordinator_for_serial(self._hass, serial)
+        if coordinator is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        broker = get_rtsp_broker(coordinator)
+        if broker is not None:
+            frame = await broker.async_get_frame()
+        elif coordinator.get_model().supports_feature(Features.CAMERA_IMAGE):
+            frame = await self._hass.async_add_executor_job(coordinator.client.request_camera_frame)
+        else:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+        if frame is None or frame.version == 0:
+            # No image received from the printer yet.
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        headers = {"Cache-Control": "no-cache"}
+        if_none_match = request.if_none_match
+        if if_none_match is not None and any(etag.value in (frame.etag, "*") for etag in if_none_match):
+            response = web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        else:
+            response = web.Response(body=frame.jpeg, content_type="image/jpeg", headers=headers)
+        response.etag = frame.etag
+        response.last_modified = frame.timestamp.timestamp()
+        return response
+
+
+class CameraStreamView(HomeAssistantView):
+    """Re-broadcasts a printer's camera to external consumers such as an NVR.
+
+    MJPEG is available for every camera. X1 printers sharing their RTSP session through the broker can also be
+    streamed as MPEG-TS. Either way the printer only sees the integration's own connection.
+    """
+
+    url = "/api/bambu_lab/camera/{serial}/{stream_format}"
+    name = "api:bambu_lab:camera"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+
+    async def get(self, request: web.Request, serial: str, stream_format: str) -> web.StreamResponse:
+        coordinator = get_coordinator_for_serial(self._hass, serial)
+        if coordinator is None or not coordinator.camera_enabled:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        if stream_format == "mjpeg":
+            return await async_stream_mjpeg(self._hass, coordinator, request)
+        broker = get_rtsp_broker(coordinator)
+        if stream_format == "mpegts" and broker is not None:
+            return await broker.async_stream_mpegts(request)
+        return web.Response(status=HTTPStatus.NOT_FOUND)
+
+
+class CoverImageView(HomeAssistantView):
+    """Serves the current print's cover image at the size asked for with ?size=thumbnail|medium|original.
+
+    Variants are generated in the executor the first time they're asked for and then served from memory.
+    """
+
+    url = "/api/bambu_lab/cover_image/{serial}"
+    name = "api:bambu_lab:cover_image"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+
+    async def get(self, request: web.Request, serial: str) -> web.StreamResponse:
+        coordinator = get_coordinator_for_serial(self._hass, serial)
+        if coordinator is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        size = request.query.get("size", "original")
+        if size != "original" and size not in COVER_VARIANTS:
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        cover_image = coordinator.get_model().cover_image
+        digest = cover_image.get_digest()
+        if digest is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        headers = {"Cache-Control": "no-cache"}
+        etag = f"{digest}-{size}"
+        if_none_match = request.if_none_match
+        if if_none_match is not None and any(value.value in (etag, "*") for value in if_none_match):
+            response = web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        else:
+            if size == "original":
+                data = cover_image.get_jpeg()
+            else:
+                data = await self._hass.async_add_executor_job(cover_image.get_variant, size)
+            if not data:
+                return web.Response(status=HTTPStatus.NOT_FOUND)
+            # The original is served as downloaded, which may be a png.
+            content_type = "image/png" if data[:4] == b"\x89PNG" else "image/jpeg"
+            response = web.Response(body=data, content_type=content_type, headers=headers)
+        response.etag = etag
+        response.last_modified = cover_image.get_last_update_time().timestamp()
+        return response
@@ -0,0 +1,16 @@
+"""Load pybambu on its own so its tests don't need Home Assistant installed."""
+import importlib.util
+import sys
+
+from pathlib import Path
+
+PYBAMBU_PATH = Path(__file__).parent.parent / "custom_components" / "bambu_lab" / "pybambu"
+
+# Importing it as part of the integration would run the integration's __init__, which needs Home Assistant.
+# Putting the integration directory on sys.path instead would let its select.py shadow the stdlib module.
+if "pybambu" not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        "pybambu", PYBAMBU_PATH / "__init__.py", submodule_search_locations=[str(PYBAMBU_PATH)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["pybambu"] = module
+    spec.loader.exec_module(module)
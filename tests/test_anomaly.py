@@ -0,0 +1,185 @@
+import functools
+import io
+import time
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from PIL import Image
+
+from pybambu import anomaly
+from pybambu.anomaly import (
+    ANOMALY_CHAOTIC_THRESHOLD,
+    ANOMALY_STATIC_DURATION,
+    ANOMALY_WINDOW,
+    AnomalyDetector,
+)
+
+
+def make_jpeg(pixels: np.ndarray) -> bytes:
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format="JPEG", quality=85)
+    return output.getvalue()
+
+
+@functools.cache
+def scene(seed: int, size=(720, 1280), noise=2) -> bytes:
+    """A smooth backdrop with a little sensor noise, like an unchanging chamber."""
+    rng = np.random.default_rng(seed)
+    backdrop = np.linspace(40, 200, size[1])[np.newaxis, :, np.newaxis] + np.zeros((size[0], 1, 3))
+    return make_jpeg(np.clip(backdrop + rng.normal(0, noise, backdrop.shape), 0, 255).astype(np.uint8))
+
+
+@functools.cache
+def toolhead(position: int) -> bytes:
+    """The backdrop with a block moving across it, like a print head at work."""
+    pixels = np.full((360, 640, 3), 120, dtype=np.uint8)
+    pixels[100:200, position:position + 80] = 20
+    return make_jpeg(pixels)
+
+
+@functools.cache
+def chaos(seed: int) -> bytes:
+    """Large blotches changing at random, like a tangle of filament in front of the camera."""
+    blotches = np.random.default_rng(seed).integers(0, 256, (9, 16, 3), dtype=np.uint8)
+    return make_jpeg(blotches.repeat(40, axis=0).repeat(40, axis=1))
+
+
+class FakeClient:
+    def __init__(self, gcode_state="RUNNING", stage="printing"):
+        self.events = []
+        self.device = SimpleNamespace(
+            print_job=SimpleNamespace(gcode_state=gcode_state),
+            stage=SimpleNamespace(description=stage),
+        )
+        self.camera_subscribers = 0
+
+    def get_device(self):
+        return self.device
+
+    def callback(self, event):
+        self.events.append(event)
+
+    def subscribe_camera(self):
+        self.camera_subscribers += 1
+
+    def unsubscribe_camera(self):
+        self.camera_subscribers -= 1
+
+
+def feed(detector, frames, start=0.0, interval=5.0, batch_size=8):
+    """Run frames through the detector as batches stamped interval seconds apart."""
+    timestamps = [start + i * interval for i in range(len(frames))]
+    for i in range(0, len(frames), batch_size):
+        detector._process(detector._generation, list(zip(timestamps, frames))[i:i + batch_size])
+    return timestamps[-1] + interval
+
+
+def make_detector(client, **config):
+    detector = AnomalyDetector(client, config)
+    detector.update()
+    return detector
+
+
+def test_static_scene_while_running_is_reported_once():
+    client = FakeClient()
+    detector = make_detector(client)
+    count = int(ANOMALY_STATIC_DURATION / 5) + 16
+    feed(detector, [scene(i % 4) for i in range(count)])
+    assert client.events == ["event_print_stalled"]
+
+
+def test_static_scene_is_reported_again_after_motion():
+    client = FakeClient()
+    detector = make_detector(client)
+    count = int(ANOMALY_STATIC_DURATION / 5) + 8
+    now = feed(detector, [scene(0)] * count)
+    now = feed(detector, [toolhead(position) for position in range(0, 400, 50)], now)
+    assert client.events == ["event_print_stalled"]
+    feed(detector, [scene(0)] * count, now)
+    assert client.events == ["event_print_stalled"] * 2
+
+
+def test_static_scene_when_paused_is_not_reported():
+    client = FakeClient()
+    detector = make_detector(client)
+    client.device.print_job.gcode_state = "PAUSE"
+    feed(detector, [scene(0)] * (int(ANOMALY_STATIC_DURATION / 5) + 8))
+    assert client.events == []
+
+
+def test_normal_printing_is_not_reported():
+    client = FakeClient()
+    detector = make_detector(client)
+    positions = [(i * 70) % 560 for i in range(ANOMALY_WINDOW * 3)]
+    feed(detector, [toolhead(position) for position in positions])
+    assert client.events == []
+    assert float(np.median(list(detector._differences))) < ANOMALY_CHAOTIC_THRESHOLD / 2
+
+
+def test_chaotic_scene_while_printing_is_reported_once():
+    client = FakeClient()
+    detector = make_detector(client)
+    feed(detector, [chaos(i) for i in range(ANOMALY_WINDOW * 2)])
+    assert client.events == ["event_print_chaotic"]
+
+
+def test_chaotic_scene_outside_printing_stage_is_not_reported():
+    client = FakeClient(stage="auto bed leveling")
+    detector = make_detector(client)
+    feed(detector, [chaos(i) for i in range(ANOMALY_WINDOW + 8)])
+    assert client.events == []
+
+
+def test_frames_are_sampled_and_batched(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(anomaly.time, "monotonic", lambda: now[0])
+    client = FakeClient()
+    detector = make_detector(client, anomaly_sample_interval=5, anomaly_batch_size=4)
+    batches = []
+    monkeypatch.setattr(detector, "_get_executor", lambda: SimpleNamespace(submit=lambda fn, *args: batches.append(args)))
+
+    # One frame a second for 40 seconds.
+    for i in range(40):
+        detector.add_frame(f"{i}".encode())
+        now[0] += 1
+    assert [[jpeg for _, jpeg in batch] for _, batch in batches] == [
+        [b"0", b"5", b"10", b"15"],
+        [b"20", b"25", b"30", b"35"],
+    ]
+    assert client.camera_subscribers == 1
+
+    client.device.print_job.gcode_state = "FINISH"
+    detector.update()
+    detector.add_frame(b"late")
+    assert len(batches) == 2
+    assert client.camera_subscribers == 0
+
+
+def test_a_change_of_resolution_starts_the_comparison_over():
+    client = FakeClient()
+    detector = make_detector(client)
+    feed(detector, [scene(0)] * 8 + [scene(0, size=(1080, 1920))] * 8)
+    assert detector._previous.shape == (135, 240)
+    assert len(detector._differences) == 7 + 7
+
+
+def test_cost_per_received_frame_is_well_under_a_millisecond(monkeypatch):
+    # A P1 chamber stream: 720p jpegs at one frame a second, sampled every five seconds by default.
+    frames = [scene(i, noise=6) for i in range(8)]
+    client = FakeClient()
+    detector = make_detector(client)
+    now = [0.0]
+    monkeypatch.setattr(anomaly.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(detector, "_get_executor", lambda: SimpleNamespace(submit=lambda fn, *args: fn(*args)))
+
+    count = 400
+    start = time.perf_counter()
+    for i in range(count):
+        detector.add_frame(frames[i % len(frames)])
+        now[0] += 1
+    elapsed = (time.perf_counter() - start) / count
+    assert len(detector._differences) > 0
+    assert elapsed < 0.001, f"{elapsed * 1000:.3f}ms per frame"
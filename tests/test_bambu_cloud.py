@@ -0,0 +1,150 @@
+import threading
+import time
+
+from pybambu import bambu_cloud
+from pybambu.bambu_cloud import (
+    BambuCloud,
+    ConnectionMechanismEnum,
+    TaskCache,
+    TASK_CACHE_INCREMENTAL_LIMIT,
+    TASK_CACHE_TASKS_PER_DEVICE,
+)
+
+
+def session_in_thread(cloud):
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(cloud._get_session()))
+    thread.start()
+    thread.join()
+    return sessions[0]
+
+
+def test_sessions_are_shared_per_account_within_a_thread(monkeypatch):
+    monkeypatch.setattr(bambu_cloud, "CONNECTION_MECHANISM", ConnectionMechanismEnum.REQUESTS)
+    cloud = BambuCloud("US", "a@example.com", "a", "token")
+
+    assert cloud._get_session() is cloud._get_session()
+    assert BambuCloud("US", "a@example.com", "a", "token")._get_session() is cloud._get_session()
+    assert BambuCloud("US", "b@example.com", "b", "token")._get_session() is not cloud._get_session()
+
+
+def test_sessions_are_not_shared_between_threads(monkeypatch):
+    monkeypatch.setattr(bambu_cloud, "CONNECTION_MECHANISM", ConnectionMechanismEnum.REQUESTS)
+    cloud = BambuCloud("US", "a@example.com", "a", "token")
+
+    assert session_in_thread(cloud) is not cloud._get_session()
+    assert session_in_thread(cloud) is not session_in_thread(cloud)
+
+
+class FakeCloud:
+    """Serves get_tasklist from a list of tasks, newest last, recording each call's limit."""
+
+    def __init__(self, tasks=()):
+        self.tasks = list(tasks)
+        self.calls = []
+        self.failing = False
+        self.delay = 0
+
+    def get_tasklist(self, limit=None):
+        self.calls.append(limit)
+        time.sleep(self.delay)
+        if self.failing:
+            return None
+        hits = sorted(self.tasks, key=lambda task: task['id'], reverse=True)
+        return {'hits': hits if limit is None else hits[:limit]}
+
+
+def task(id, deviceId="S1"):
+    return {'id': id, 'deviceId': deviceId}
+
+
+def test_merge_indexes_tasks_by_device_newest_first():
+    cache = TaskCache()
+    cache._merge({}, [task(1), task(3, "S2"), task(2)])
+    cache._merge(cache._tasks, [task(4), task(2)])
+
+    assert [t['id'] for t in cache._tasks_by_device["S1"]] == [4, 2, 1]
+    assert [t['id'] for t in cache._tasks_by_device["S2"]] == [3]
+    assert cache._newest_id == 4
+
+
+def test_merge_keeps_a_limited_number_of_tasks_per_device():
+    cache = TaskCache()
+    cache._merge({}, [task(id) for id in range(TASK_CACHE_TASKS_PER_DEVICE + 5)])
+
+    ids = [t['id'] for t in cache._tasks_by_device["S1"]]
+    assert ids == list(range(TASK_CACHE_TASKS_PER_DEVICE + 4, 4, -1))
+    assert set(cache._tasks) == set(ids)
+
+
+def test_refresh_fetches_only_recent_tasks_after_the_first():
+    cloud = FakeCloud([task(1), task(2)])
+    cache = TaskCache()
+    assert [t['id'] for t in cache.get_tasks(cloud, "S1", 0)] == [2, 1]
+    assert cloud.calls == [None]
+
+    cloud.tasks.append(task(3))
+    assert [t['id'] for t in cache.get_tasks(cloud, "S1", 0)] == [3, 2, 1]
+    assert cloud.calls == [None, TASK_CACHE_INCREMENTAL_LIMIT]
+
+    # Fresh enough, so nothing is fetched.
+    cache.get_tasks(cloud, "S1", 60)
+    assert len(cloud.calls) == 2
+
+
+def test_refresh_falls_back_to_a_full_download_when_every_recent_task_is_new():
+    cloud = FakeCloud([task(1)])
+    cache = TaskCache()
+    cache.get_tasks(cloud, "S1", 0)
+
+    cloud.tasks += [task(id) for id in range(2, TASK_CACHE_INCREMENTAL_LIMIT + 3)]
+    tasks = cache.get_tasks(cloud, "S1", 0)
+    assert cloud.calls == [None, TASK_CACHE_INCREMENTAL_LIMIT, None]
+    assert tasks[-1]['id'] == 1
+    assert len(tasks) == TASK_CACHE_INCREMENTAL_LIMIT + 2
+
+
+def test_concurrent_callers_share_one_refresh():
+    cloud = FakeCloud([task(1)])
+    cloud.delay = 0.2
+    cache = TaskCache()
+    threads = [threading.Thread(target=cache.get_tasks, args=(cloud, "S1", 60)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cloud.calls == [None]
+
+
+def test_a_failed_refresh_costs_one_request(monkeypatch):
+    cloud = FakeCloud([task(1)])
+    cloud.failing = True
+    cloud.delay = 0.2
+    cache = TaskCache()
+    threads = [threading.Thread(target=cache.get_tasks, args=(cloud, "S1", 0)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cloud.calls == [None]
+    assert cache.get_tasks(cloud, "S1", 0) == []
+    assert cloud.calls == [None]
+
+    # Once the backoff has passed the next caller retries.
+    cloud.failing = False
+    cloud.delay = 0
+    monkeypatch.setattr(bambu_cloud, "TASK_CACHE_FAILURE_BACKOFF", 0)
+    assert [t['id'] for t in cache.get_tasks(cloud, "S1", 0)] == [1]
+    assert cloud.calls == [None, None]
+
+
+def test_a_failed_incremental_refresh_keeps_the_cached_tasks():
+    cloud = FakeCloud([task(1)])
+    cache = TaskCache()
+    cache.get_tasks(cloud, "S1", 0)
+
+    cloud.failing = True
+    assert [t['id'] for t in cache.get_tasks(cloud, "S1", 0)] == [1]
+    assert cache.get_tasks(cloud, "S1", 0)[0]['id'] == 1
+    # No fallback to a full download, and no retry within the backoff.
+    assert cloud.calls == [None, TASK_CACHE_INCREMENTAL_LIMIT]
@@ -0,0 +1,127 @@
+import json
+import os
+
+from pybambu import cover_cache
+from pybambu.cover_cache import COVER_CACHE_INDEX, CoverImageCache, get_cover_digest, get_cover_url_key
+
+
+def read_index(directory):
+    with open(os.path.join(directory, COVER_CACHE_INDEX)) as file:
+        return json.load(file)
+
+
+def test_images_are_found_under_any_of_their_keys(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1", "url:a"], b"one")
+
+    assert cache.get_image("task:2", "url:a") == b"one"
+    # The first lookup recorded the task id too.
+    assert cache.get_image("task:2") == b"one"
+    assert cache.get_image("task:3") is None
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1"], b"same")
+    cache.put_image(["task:2"], b"same")
+
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{get_cover_digest(b'same')}.img", COVER_CACHE_INDEX])
+
+
+def test_least_recently_used_images_are_evicted_first(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cover_cache.time, "time", lambda: now[0])
+    cache = CoverImageCache(str(tmp_path), 30)
+    for i in range(3):
+        now[0] += 1
+        cache.put_image([f"task:{i}"], bytes([i]) * 10)
+    now[0] += 1
+    assert cache.get_image("task:0") is not None
+
+    now[0] += 1
+    cache.put_image(["task:3"], b"3" * 10)
+    assert cache.get_image("task:1") is None
+    assert cache.get_image("task:0") is not None
+    assert cache.get_image("task:2") is not None
+    assert cache.get_image("task:3") is not None
+    assert not os.path.exists(cache._get_path(get_cover_digest(bytes([1]) * 10)))
+    assert "task:1" not in read_index(tmp_path)["keys"]
+
+
+def test_variants_count_towards_the_size_and_are_evicted_with_their_original(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cover_cache.time, "time", lambda: now[0])
+    cache = CoverImageCache(str(tmp_path), 35)
+    cache.put_image(["task:0"], b"0" * 10)
+    digest = get_cover_digest(b"0" * 10)
+    cache.put_variant(digest, "thumbnail", b"t" * 10)
+    assert cache.get_variant(digest, "thumbnail") == b"t" * 10
+    now[0] += 1
+    cache.put_image(["task:1"], b"1" * 10)
+
+    # Only over budget because of the variant.
+    now[0] += 1
+    cache.put_image(["task:2"], b"2" * 10)
+    assert cache.get_image("task:0") is None
+    assert cache.get_variant(digest, "thumbnail") is None
+    assert not os.path.exists(cache._get_path(digest, "thumbnail"))
+    assert cache.get_image("task:1") is not None
+    assert cache.get_image("task:2") is not None
+
+
+def test_variant_of_an_evicted_image_is_not_stored(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_variant("missing", "thumbnail", b"t")
+    assert cache.get_variant("missing", "thumbnail") is None
+    assert not os.path.exists(cache._get_path("missing", "thumbnail"))
+
+
+def test_hits_update_the_index_lazily(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1"], b"one")
+    index = read_index(tmp_path)
+    mtime = os.stat(tmp_path / COVER_CACHE_INDEX).st_mtime_ns
+
+    for _ in range(10):
+        assert cache.get_image("task:1", "url:a") == b"one"
+    assert os.stat(tmp_path / COVER_CACHE_INDEX).st_mtime_ns == mtime
+    assert read_index(tmp_path) == index
+
+    cache.flush()
+    index = read_index(tmp_path)
+    assert index["keys"]["url:a"] == get_cover_digest(b"one")
+    assert index["files"][get_cover_digest(b"one")]["used"] > 0
+
+
+def test_hits_are_saved_once_the_flush_interval_has_passed(tmp_path, monkeypatch):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1"], b"one")
+    monkeypatch.setattr(cover_cache, "COVER_CACHE_INDEX_FLUSH_INTERVAL", 0)
+    cache.get_image("task:1", "url:a")
+    assert "url:a" in read_index(tmp_path)["keys"]
+
+
+def test_index_survives_a_restart(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1", get_cover_url_key("https://host/cover.png?sig=1")], b"one")
+
+    cache = CoverImageCache(str(tmp_path), 1000)
+    assert cache.get_image(get_cover_url_key("https://host/cover.png?sig=2")) == b"one"
+
+
+def test_images_without_an_index_are_kept_for_eviction(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1000)
+    cache.put_image(["task:1"], b"1" * 10)
+    digest = get_cover_digest(b"1" * 10)
+    cache.put_variant(digest, "thumbnail", b"t")
+    os.remove(tmp_path / COVER_CACHE_INDEX)
+    (tmp_path / "orphan.thumbnail.img").write_bytes(b"x")
+
+    cache = CoverImageCache(str(tmp_path), 10)
+    cache._load()
+    assert set(cache._files) == {digest}
+    assert cache._files[digest]["variants"] == {"thumbnail": 1}
+    assert not os.path.exists(tmp_path / "orphan.thumbnail.img")
+
+    cache.put_image(["task:2"], b"2" * 10)
+    assert not os.path.exists(cache._get_path(digest))
@@ -0,0 +1,77 @@
+import io
+
+from types import SimpleNamespace
+
+import pytest
+
+from PIL import Image
+
+from pybambu.cover_cache import COVER_VARIANTS, CoverImageCache
+from pybambu.models import CoverImage
+
+
+def make_image(size, format="JPEG", mode="RGB") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, size, (200, 100, 50, 0)[:len(mode)]).save(output, format=format)
+    return output.getvalue()
+
+
+def make_cover(cache=None) -> CoverImage:
+    return CoverImage(SimpleNamespace(callback=None, cover_cache=cache, _serial="S1"))
+
+
+@pytest.mark.parametrize("variant", list(COVER_VARIANTS))
+def test_variants_fit_their_bounding_box(variant):
+    cover = make_cover()
+    cover.set_jpeg(make_image((1024, 768)))
+
+    image = Image.open(io.BytesIO(cover.get_variant(variant)))
+    assert image.format == "JPEG"
+    assert image.size[0] <= COVER_VARIANTS[variant][0] and image.size[1] <= COVER_VARIANTS[variant][1]
+    assert max(image.size) == max(COVER_VARIANTS[variant])
+
+
+def test_transparent_png_is_flattened_onto_white():
+    cover = make_cover()
+    cover.set_jpeg(make_image((300, 300), "PNG", "RGBA"))
+
+    image = Image.open(io.BytesIO(cover.get_variant("thumbnail")))
+    assert image.mode == "RGB"
+    assert all(channel > 245 for channel in image.getpixel((64, 64)))
+
+
+def test_variants_are_stored_in_the_cache_and_reused(tmp_path):
+    cache = CoverImageCache(str(tmp_path), 1024 * 1024)
+    original = make_image((1024, 768))
+    cache.put_image(["task:1"], original)
+    cover = make_cover(cache)
+    cover.set_jpeg(original)
+
+    thumbnail = cover.get_variant("thumbnail")
+    assert cache.get_variant(cover.get_digest(), "thumbnail") == thumbnail
+
+    # A new cover object, as after a restart, gets the variant from the cache.
+    cover = make_cover(cache)
+    cover.set_jpeg(original)
+    cache.put_variant(cover.get_digest(), "thumbnail", b"cached")
+    assert cover.get_variant("thumbnail") == b"cached"
+
+
+def test_variants_are_regenerated_when_the_cover_changes():
+    cover = make_cover()
+    cover.set_jpeg(make_image((1024, 768)))
+    first = cover.get_variant("medium")
+    cover.set_jpeg(make_image((256, 256)))
+    second = cover.get_variant("medium")
+    assert Image.open(io.BytesIO(first)).size == (512, 384)
+    assert Image.open(io.BytesIO(second)).size == (256, 256)
+
+
+def test_original_is_served_when_a_variant_cannot_be_generated():
+    cover = make_cover()
+    cover.set_jpeg(b"not an image")
+    assert cover.get_variant("thumbnail") == b"not an image"
+
+
+def test_no_cover_has_no_variants():
+    assert make_cover().get_variant("thumbnail") is None
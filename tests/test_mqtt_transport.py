@@ -0,0 +1,63 @@
+import socket
+import ssl
+import threading
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import paho.mqtt.client as mqtt
+
+from pybambu.bambu_client import AsyncioMqttTransport
+
+CERTIFICATE = Path(__file__).parent / "localhost.pem"
+CONNACK = b"\x20\x02\x00\x00"
+
+
+def publish_packet(topic: str, payload: bytes) -> bytes:
+    body = len(topic).to_bytes(2, "big") + topic.encode() + payload
+    assert len(body) < 128
+    return bytes([0x30, len(body)]) + body
+
+
+def serve_once(listener: socket.socket, packets: bytes, done: threading.Event):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(CERTIFICATE)
+    connection, _ = listener.accept()
+    with context.wrap_socket(connection, server_side=True) as sock:
+        sock.recv(1024)  # CONNECT
+        sock.sendall(CONNACK)
+        time.sleep(0.2)
+        # A single write is sent as a single TLS record.
+        sock.sendall(packets)
+        done.wait(10)
+
+
+def test_reads_every_packet_in_a_tls_record():
+    count = 5
+    listener = socket.create_server(("127.0.0.1", 0))
+    done = threading.Event()
+    packets = b"".join(publish_packet("device/S1/report", f"{i}".encode()) for i in range(count))
+    server = threading.Thread(target=serve_once, args=(listener, packets, done), daemon=True)
+    server.start()
+
+    received = []
+    client = mqtt.Client()
+    client.tls_set(cert_reqs=ssl.CERT_NONE)
+    client.tls_insecure_set(True)
+    client.on_message = lambda client, userdata, message: received.append(message.payload)
+    owner = SimpleNamespace(client=client, host="127.0.0.1", _local_mqtt=True, _port=listener.getsockname()[1])
+    transport = AsyncioMqttTransport(owner)
+    transport.start()
+    try:
+        # Well inside the 5s keepalive, which would otherwise be what makes the socket readable again.
+        deadline = time.monotonic() + 2
+        while len(received) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert received == [f"{i}".encode() for i in range(count)]
+    finally:
+        done.set()
+        transport.stop()
+        client.disconnect()
+        transport.join(5)
+        listener.close()
@@ -0,0 +1,128 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from pybambu import timelapse
+from pybambu.timelapse import TimelapseRecorder
+
+
+def make_ffmpeg(tmp_path, body: str) -> str:
+    """A stand in for ffmpeg. The script gets the output path as its last argument."""
+    path = tmp_path / "ffmpeg"
+    path.write_text(f"#!{sys.executable}\nimport sys, time\noutput = sys.argv[-1]\n{body}\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+COPY_STDIN = "open(output, 'wb').write(sys.stdin.buffer.read())"
+
+
+def make_client(gcode_state="RUNNING"):
+    print_job = SimpleNamespace(gcode_state=gcode_state, subtask_name="benchy", current_layer=0)
+    device = SimpleNamespace(print_job=print_job, info=SimpleNamespace(device_type="P1S"))
+    return SimpleNamespace(
+        _serial="S1",
+        _device=device,
+        get_device=lambda: device,
+        subscribe_camera=lambda: None,
+        unsubscribe_camera=lambda: None,
+    )
+
+
+def make_recorder(tmp_path, ffmpeg, **config):
+    client = make_client()
+    config = {
+        'timelapse_directory': str(tmp_path / "timelapse"),
+        'ffmpeg_binary': ffmpeg,
+        'timelapse_capture': "interval",
+        'timelapse_interval': 0,
+        **config,
+    }
+    return client, TimelapseRecorder(client, config)
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_spills_to_segment_and_assembles_in_order(tmp_path):
+    client, recorder = make_recorder(tmp_path, make_ffmpeg(tmp_path, COPY_STDIN), timelapse_memory_limit=30)
+    frames = [f"frame{i:02d}".encode() for i in range(10)]
+
+    recorder.update()
+    assert recorder.recording
+    for frame in frames:
+        recorder.add_frame(frame)
+    # Only as many frames as fit in the limit are held in memory. The rest were spilled to the segment file.
+    assert recorder._frames_size <= 30
+    segment_path = recorder._segment.name
+    recorder._segment.flush()
+    assert os.path.getsize(segment_path) > 0
+
+    client._device.print_job.gcode_state = "FINISH"
+    recorder.update()
+    output_path = recorder._output_path
+    wait_for(lambda: not os.path.exists(segment_path) and os.path.exists(output_path))
+    wait_for(lambda: len(open(output_path, "rb").read()) == len(b"".join(frames)))
+    assert open(output_path, "rb").read() == b"".join(frames)
+
+
+def test_layer_capture_takes_one_frame_per_layer(tmp_path):
+    client, recorder = make_recorder(tmp_path, "ffmpeg", timelapse_capture="layer")
+    recorder.update()
+    print_job = client._device.print_job
+    for layer in (0, 1, 1, 2, 2, 3):
+        print_job.current_layer = layer
+        recorder.add_frame(f"layer{layer}".encode())
+    assert list(recorder._frames) == [b"layer1", b"layer2", b"layer3"]
+
+
+def test_assembly_is_not_blocked_by_ffmpeg_error_output(tmp_path, caplog):
+    # Fill far more than a pipe buffer with errors before reading any input.
+    ffmpeg = make_ffmpeg(tmp_path, "sys.stderr.write('bad frame\\n' * 100000)\nsys.stdin.buffer.read()\nsys.exit(1)")
+    _, recorder = make_recorder(tmp_path, ffmpeg)
+    frames = deque([b"x" * 65536] * 16)
+
+    thread = threading.Thread(target=recorder._assemble, args=(str(tmp_path / "out.mp4"), None, frames), daemon=True)
+    with caplog.at_level(logging.ERROR):
+        thread.start()
+        thread.join(20)
+    assert not thread.is_alive()
+    assert "Timelapse assembly failed:" in caplog.text
+    assert caplog.text.rstrip().endswith("bad frame")
+    # Only the tail of the error output is logged.
+    assert len(caplog.text) < 2 * timelapse.TIMELAPSE_ERROR_LOG_SIZE
+
+
+def test_assembly_times_out(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(timelapse, "TIMELAPSE_ASSEMBLE_TIMEOUT", 0.5)
+    ffmpeg = make_ffmpeg(tmp_path, "sys.stdin.buffer.read()\ntime.sleep(30)")
+    _, recorder = make_recorder(tmp_path, ffmpeg)
+
+    start = time.monotonic()
+    with caplog.at_level(logging.ERROR):
+        recorder._assemble(str(tmp_path / "out.mp4"), None, deque([b"frame"]))
+    assert time.monotonic() - start < 10
+    assert "timed out" in caplog.text
+
+
+@pytest.mark.parametrize("frame_count", [0, 1])
+def test_too_few_frames_are_not_assembled(tmp_path, frame_count):
+    client, recorder = make_recorder(tmp_path, make_ffmpeg(tmp_path, COPY_STDIN))
+    recorder.update()
+    for i in range(frame_count):
+        recorder.add_frame(b"frame")
+    client._device.print_job.gcode_state = "IDLE"
+    recorder.update()
+    time.sleep(0.2)
+    assert not os.path.exists(recorder._output_path)